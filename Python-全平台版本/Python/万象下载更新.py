@@ -2,17 +2,30 @@ import time
 import subprocess
 import configparser
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import hashlib
+import zlib
 import json
 from datetime import datetime, timezone, timedelta
 import sys
 import zipfile
 import shutil
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import fnmatch
+import heapq
 import re
-from typing import Tuple, Optional, List, Dict
+import argparse
+import contextlib
+from typing import Tuple, Optional, List, Dict, Set
 from tqdm import tqdm
+try:
+    import resource  # 统计进程内存峰值（Windows无此模块）
+except ImportError:
+    resource = None
 
 UPDATE_TOOLS_VERSION = "DEFAULT_UPDATE_TOOLS_VERSION_TAG"
 # ====================== 全局配置 ======================
@@ -26,12 +39,44 @@ DICT_TAG = "dict-nightly"
 MODEL_REPO = "RIME-LMDG"
 MODEL_TAG = "LTS"
 MODEL_FILE = "wanxiang-lts-zh-hans.gram"
+MODEL_BLOCKS_SUFFIX = ".blocks.json"   # 模型分块校验文件后缀（与模型一同发布时启用增量更新）
+MODEL_DELTA_BLOCK_SIZE = 64 * 1024     # 生成分块校验文件时的默认分块大小
+MODEL_DELTA_MAX_RATIO = 0.7            # 需下载的变化部分超过该比例时直接完整下载
 
 CNB_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36",
     "Accept-Language": "zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7",
     "Accept": "application/vnd.cnb.web+json" # 确保返回JSON
 }
+# 网络请求配置
+HTTP_CONNECT_TIMEOUT = 10       # 建立连接超时（秒）
+HTTP_READ_TIMEOUT = 60          # 读取数据超时（秒）
+HTTP_MAX_RETRIES = 3            # 连接失败/服务端错误时的最大重试次数
+HTTP_BACKOFF_FACTOR = 1         # 重试退避系数：1s、2s、4s...
+HTTP_POOL_MAXSIZE = 8           # 每个主机保持的最大连接数
+CHECK_TIMEOUT = 30              # 并发检查更新时每次请求尝试的超时（秒），传输层重试时按次计算
+DOWNLOAD_CONCURRENCY = 3        # 默认同时下载的组件数量
+MODEL_DOWNLOAD_SEGMENTS = 4     # 模型分段下载的默认连接数
+SEGMENT_SIZE = 8 * 1024 * 1024  # 分段下载的分块大小（也是断点续传的粒度）
+SOURCE_PROBE_BYTES = 256 * 1024 # 自动选源时每个下载源的探测数据量
+HASH_BUFFER_SIZE = 1024 * 1024  # 计算文件哈希时的读取缓冲区大小
+DIGEST_CACHE_MAX_ENTRIES = 64   # 文件摘要缓存的最大条目数
+EXTRACT_BUFFER_SIZE = 256 * 1024  # 解压时每次写入的数据块大小
+EXTRACT_MAX_WORKERS = 4         # 自动确定并行解压线程数时的上限
+EXTRACT_PARALLEL_MIN_SIZE = 4 * 1024 * 1024  # 待写入数据少于该大小时仍逐个解压
+RANGE_READAHEAD = 256 * 1024    # 远程读取压缩包时每次范围请求的最小数据量
+ZIP_TAIL_PROBE = 65536 + 22     # 探测远程压缩包时读取的尾部长度（目录结束记录+最长注释）
+MEMORY_BUDGET_MB = 128          # 低内存模式的默认内存预算（MB），决定缓冲区大小与并发数，内存峰值超出时提示
+LOW_MEMORY_BUFFER_RATIO = 2048  # 低内存模式下单个读写、哈希及范围请求缓冲区占内存预算的比例（1/N，默认预算时为64KB）
+LOW_MEMORY_MIN_BUFFER = 16 * 1024  # 低内存模式下缓冲区的最小值
+LOW_MEMORY_WORKER_MB = 128      # 低内存模式下每个并发线程（下载、解压、检查、测速）需要的预算（MB）
+CHECK_INTERVAL = 3600           # 无人值守模式两次联网检查的最短间隔（秒），期间上次检查无更新时直接退出
+CHECK_STATE_FILE = "update_check.json"  # 无人值守模式上次检查结果（与settings.ini同目录）
+# 无人值守模式（--check/--apply）的退出码
+EXIT_UP_TO_DATE = 0             # 已是最新，未做任何改动
+EXIT_FAILED = 1                 # 检查或更新失败
+EXIT_UPDATES_AVAILABLE = 2      # 有可用更新（--check）
+EXIT_UPDATED = 3                # 已安装更新（--apply）
 # Zh词库目录
 ZH_DICTS = ZH_DICTS_PRO = "dicts"
 SCHEME_MAP = {
@@ -140,10 +185,203 @@ if SYSTEM_TYPE == 'windows':
             return None
 
 
+# ====================== 内存控制 ======================
+class MemoryBudget:
+    """
+    低内存模式（iOS a-Shell/Hamster、小内存安卓设备）：按内存预算限制所有流式缓冲区的大小
+    及下载、解压、检查与测速的并发数（默认预算下均只使用一个线程），并统计进程的内存峰值
+    """
+    def __init__(self):
+        self.low_memory = False
+        self.budget_mb = MEMORY_BUDGET_MB
+
+    def configure(self, low_memory, budget_mb) -> None:
+        self.low_memory = low_memory
+        self.budget_mb = budget_mb if budget_mb > 0 else MEMORY_BUDGET_MB
+
+    def buffer(self, size) -> int:
+        """实际使用的缓冲区大小"""
+        if not self.low_memory:
+            return size
+        limit = max(LOW_MEMORY_MIN_BUFFER, self.budget_mb * 1024 * 1024 // LOW_MEMORY_BUFFER_RATIO)
+        return min(size, limit)
+
+    def workers(self, count) -> int:
+        """实际使用的并发数"""
+        if not self.low_memory:
+            return max(1, count)
+        return max(1, min(count, self.budget_mb // LOW_MEMORY_WORKER_MB))
+
+    @staticmethod
+    def peak_rss() -> Optional[int]:
+        """进程内存峰值（字节），无法获取时返回None"""
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS/iOS以字节为单位，Linux/Android以KB为单位
+        return peak if sys.platform in ('darwin', 'ios') else peak * 1024
+
+    def report(self) -> None:
+        """低内存模式下输出内存峰值，超出预算时提示"""
+        if not self.low_memory:
+            return
+        peak = self.peak_rss()
+        if peak is None:
+            return
+        peak_mb = peak / 1024 / 1024
+        if peak_mb > self.budget_mb:
+            print_warning(f"内存峰值 {peak_mb:.1f} MB，超出预算 {self.budget_mb} MB")
+        else:
+            print(f"{COLOR['OKBLUE']}[i] 内存峰值 {peak_mb:.1f} MB（预算 {self.budget_mb} MB）{COLOR['ENDC']}")
+
+
+MEMORY = MemoryBudget()
+
+
+# ====================== 网络传输 ======================
+class HttpTransport:
+    """共享HTTP传输层：连接池保活、按主机限制连接数、显式超时与退避重试"""
+    def __init__(self,
+                 pool_maxsize=HTTP_POOL_MAXSIZE,
+                 connect_timeout=HTTP_CONNECT_TIMEOUT,
+                 read_timeout=HTTP_READ_TIMEOUT,
+                 max_retries=HTTP_MAX_RETRIES
+                ):
+        self.timeout = (connect_timeout, read_timeout)
+        retry_options = dict(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            backoff_factor=HTTP_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        try:
+            retry = Retry(allowed_methods=frozenset(['GET', 'HEAD']), **retry_options)
+        except TypeError:
+            # 兼容旧版urllib3
+            retry = Retry(method_whitelist=frozenset(['GET', 'HEAD']), **retry_options)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, **kwargs) -> requests.Response:
+        """发起GET请求（未指定超时时使用默认连接/读取超时）"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def head(self, url, **kwargs) -> requests.Response:
+        """发起HEAD请求"""
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('allow_redirects', True)
+        return self.session.head(url, **kwargs)
+
+    def close(self) -> None:
+        """关闭连接池"""
+        self.session.close()
+
+
+class HttpRangeFile:
+    """
+    通过HTTP范围请求按需读取远程文件的只读文件对象
+    供zipfile直接读取远程压缩包：只会请求中央目录及实际读取的成员所在的字节范围
+    """
+    def __init__(self, http, url, size, readahead=None):
+        self.http = http
+        self.url = url
+        self.size = size
+        self.readahead = readahead or MEMORY.buffer(RANGE_READAHEAD)
+        self.pos = 0
+        self.bytes_fetched = 0
+        self._buf_start = 0
+        self._buf = b''
+
+    @classmethod
+    def open(cls, http, url, readahead=None):
+        """
+        探测远程文件并读取其尾部（压缩包的目录结束记录）
+        Returns:
+            HttpRangeFile: 服务器支持范围请求时返回文件对象，否则返回None
+        """
+        with http.get(url, headers={'Range': f'bytes=-{ZIP_TAIL_PROBE}'}, stream=True) as response:
+            content_range = response.headers.get('Content-Range', '')
+            match = re.match(r'bytes (\d+)-(\d+)/(\d+)', content_range)
+            if response.status_code != 206 or not match:
+                # 服务器忽略了Range（如返回200完整内容）：不读取响应体直接关闭连接，由调用方改为完整下载
+                return None
+            # 跟随重定向后的实际地址，避免每次范围请求重复跳转
+            remote = cls(http, response.url, int(match.group(3)), readahead)
+            remote._buf_start = int(match.group(1))
+            remote._buf = response.content
+            remote.bytes_fetched = len(remote._buf)
+        if remote._buf_start + len(remote._buf) != remote.size:
+            return None
+        return remote
+
+    def _fetch(self, start, end) -> bytes:
+        """请求[start, end]范围的数据，服务器未按范围返回时抛出异常"""
+        with self.http.get(self.url, headers={'Range': f'bytes={start}-{end}'}, stream=True) as response:
+            if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {start}-'):
+                raise IOError(f"范围请求失败: HTTP {response.status_code}")
+            data = response.content
+        if len(data) != end - start + 1:
+            raise IOError("范围请求返回的数据不完整")
+        self.bytes_fetched += len(data)
+        return data
+
+    def read(self, n=-1) -> bytes:
+        if n is None or n < 0:
+            n = self.size - self.pos
+        n = max(0, min(n, self.size - self.pos))
+        if n == 0:
+            return b''
+        end = self.pos + n
+        if not (self._buf_start <= self.pos and end <= self._buf_start + len(self._buf)):
+            # 缓冲区未命中：从当前位置起至少预读readahead字节，顺序读取小块时不必逐次请求
+            fetch_end = min(self.size, max(end, self.pos + self.readahead))
+            self._buf = self._fetch(self.pos, fetch_end - 1)
+            self._buf_start = self.pos
+        data = self._buf[self.pos - self._buf_start:end - self._buf_start]
+        self.pos = end
+        return data
+
+    def seek(self, offset, whence=0) -> int:
+        if whence == 1:
+            offset += self.pos
+        elif whence == 2:
+            offset += self.size
+        if offset < 0:
+            raise OSError("无效的读取位置")
+        self.pos = offset
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self._buf = b''
+
+
 # ====================== 配置管理器 ======================
 class ConfigManager:
     """配置管理类"""
-    def __init__(self):
+    def __init__(self, release_catalog=None, http=None, interactive=True):
+        """
+        Args:
+            release_catalog (ReleaseCatalog): 沿用已有的发布信息目录（重新加载配置时传入，避免重复请求）
+            http (HttpTransport): 沿用已有的HTTP传输层（复用已建立的连接）
+            interactive (bool): 是否允许交互（无人值守模式下不运行配置向导、不确认配置）
+        """
+        self.interactive = interactive
+        self.release_catalog = release_catalog or ReleaseCatalog()
+        self.http = http or HttpTransport()
         self.config_path = self._get_config_path()
         self.config = configparser.ConfigParser()
         self.rime_engine = ''
@@ -152,6 +390,7 @@ class ConfigManager:
         self.zh_dicts_dir = ''
         self.reload_flag = False
         self.auto_update = False
+        self.exclude_matcher = ExcludeMatcher(())
         self._ensure_config_exists()
 
     def detect_installation_paths(self, show=False):
@@ -243,7 +482,8 @@ class ConfigManager:
             else:
                 print(f"{INDENT}无效的选择，请重新选择。")
 
-    def _get_config_path(self) -> str:
+    @staticmethod
+    def _get_config_path() -> str:
         """获取配置文件路径"""
         # 检查程序是否是打包后的可执行文件。如果是，sys.frozen 属性会被设置为 True
         if getattr(sys, 'frozen', False):
@@ -261,6 +501,8 @@ class ConfigManager:
             if not self._check_hamster_path():
                 return
         if not os.path.exists(self.config_path):
+            if not self.interactive:
+                raise FileNotFoundError(f"配置文件不存在: {self.config_path}，请先交互运行脚本完成配置")
             print_warning("正在创建一个新的配置文件。")
             self._init_empty_config()
             if SYSTEM_TYPE == 'macos':
@@ -278,9 +520,24 @@ class ConfigManager:
             print_warning(COLOR['YELLOW'] + "配置文件已存在，将加载配置。" + COLOR['ENDC'])
             new_config_items = {
                 'auto_update': 'false',
+                'release_cache_ttl': '300',
+                'download_concurrency': str(DOWNLOAD_CONCURRENCY),
+                'model_segments': str(MODEL_DOWNLOAD_SEGMENTS),
+                'auto_source': 'false',
+                'model_delta': 'true',
+                'incremental_extract': 'true',
+                'partial_zip': 'false',
+                'extract_workers': '0',
+                'keep_archives': 'false',
+                'low_memory': 'false',
+                'memory_budget_mb': str(MEMORY_BUDGET_MB),
+                'remote_fingerprint': 'true',
+                'check_interval': str(CHECK_INTERVAL),
             }
             self._add_new_config_items(new_config_items)
             self._try_load_config()
+            if not self.interactive:
+                return
             self._print_config_info()  # 打印配置信息
             self._confirm_config()  # 确认配置是否符合预期
 
@@ -364,7 +621,19 @@ class ConfigManager:
             'github_token': '',
             'exclude_files': '',
             'auto_update': 'false',
-
+            'release_cache_ttl': '300',
+            'download_concurrency': str(DOWNLOAD_CONCURRENCY),
+            'model_segments': str(MODEL_DOWNLOAD_SEGMENTS),
+            'auto_source': 'false',
+            'model_delta': 'true',
+            'incremental_extract': 'true',
+            'partial_zip': 'false',
+            'extract_workers': '0',
+            'keep_archives': 'false',
+            'low_memory': 'false',
+            'memory_budget_mb': str(MEMORY_BUDGET_MB),
+            'remote_fingerprint': 'true',
+            'check_interval': str(CHECK_INTERVAL),
         }
         
     def _write_config(self) -> None:
@@ -449,14 +718,18 @@ class ConfigManager:
                 owner=OWNER,
                 repo=CNB_REPO if self.config.getboolean('Settings', 'use_mirror') else REPO,
                 pattern=scheme_pattern,
-                use_mirror=self.config.getboolean('Settings', 'use_mirror')
+                use_mirror=self.config.getboolean('Settings', 'use_mirror'),
+                catalog=self.release_catalog,
+                http=self.http
             )
             dict_checker = FileChecker(
                 owner=OWNER,
                 repo=CNB_REPO if self.config.getboolean('Settings', 'use_mirror') else REPO,
                 pattern=dict_pattern,
                 use_mirror=self.config.getboolean('Settings', 'use_mirror'),
-                tag=DICT_TAG
+                tag=DICT_TAG,
+                catalog=self.release_catalog,
+                http=self.http
             )
             
             # 获取文件名
@@ -516,6 +789,19 @@ class ConfigManager:
             ("[github_token]", "GitHub令牌(可选)", 'github_token'),
             ("[exclude_files]", "更新时需保留的免覆盖文件(默认为空,逗号分隔...格式如下tips_show.txt", 'exclude_files'),
             ("[auto_update]", "是否跳过确认并自动更新(默认false)", 'auto_update'),
+            ("[release_cache_ttl]", "发布信息在本次运行内的复用时间(秒,默认300,0为不过期)", 'release_cache_ttl'),
+            ("[download_concurrency]", f"自动更新时同时下载的组件数量(默认{DOWNLOAD_CONCURRENCY},1为逐个下载)", 'download_concurrency'),
+            ("[model_segments]", f"模型分段下载的连接数(默认{MODEL_DOWNLOAD_SEGMENTS},1为单连接下载)", 'model_segments'),
+            ("[auto_source]", "下载时自动选择cnb与GitHub中较快的源(默认false,检查更新仍按use_mirror)", 'auto_source'),
+            ("[model_delta]", "发布了分块校验文件时模型只下载变化部分(默认true)", 'model_delta'),
+            ("[incremental_extract]", "解压时只写入CRC或大小有变化的文件(默认true)", 'incremental_extract'),
+            ("[partial_zip]", "方案/词库通过范围请求只下载变化的文件(默认false,需开启incremental_extract)", 'partial_zip'),
+            ("[extract_workers]", f"并行解压的线程数(默认0按CPU核数自动,最多{EXTRACT_MAX_WORKERS};1为逐个解压,iOS自动时逐个解压)", 'extract_workers'),
+            ("[keep_archives]", "安装后在UpdateCache中保留方案/词库压缩包(默认false,清理只依赖安装清单)", 'keep_archives'),
+            ("[low_memory]", "低内存模式:按内存预算缩小读写缓冲区并限制并发(默认false,iOS或小内存设备被系统终止时开启)", 'low_memory'),
+            ("[memory_budget_mb]", f"低内存模式的内存预算(MB,默认{MEMORY_BUDGET_MB}),每{LOW_MEMORY_WORKER_MB}MB允许一个并发线程,更新后内存峰值超出时提示", 'memory_budget_mb'),
+            ("[remote_fingerprint]", "下载前对比远端文件的ETag/大小及压缩包目录,内容未变化时不下载(默认true)", 'remote_fingerprint'),
+            ("[check_interval]", f"--check/--apply模式两次联网检查的最短间隔(秒,默认{CHECK_INTERVAL},0为每次都检查)", 'check_interval'),
         ]
         
         for item in path_display:
@@ -542,6 +828,11 @@ class ConfigManager:
         self.config.read(self.config_path, encoding='utf-8')
         config = {k: v.strip('"') for k, v in self.config['Settings'].items()}
         github_token = config.get('github_token', '')
+        self.release_catalog.ttl = self.config.getint('Settings', 'release_cache_ttl', fallback=300)
+        MEMORY.configure(
+            self.config.getboolean('Settings', 'low_memory', fallback=False),
+            self.config.getint('Settings', 'memory_budget_mb', fallback=MEMORY_BUDGET_MB)
+        )
         
         # 读取排除文件配置
         exclude_files = [
@@ -549,6 +840,9 @@ class ConfigManager:
             for pattern in re.split(r',|，', self.config.get('Settings', 'exclude_files', fallback=''))  # 同时分割中英文逗号
             if pattern.strip()
         ]
+        if tuple(exclude_files) != self.exclude_matcher.patterns:
+            # 排除规则只在配置变化时重新编译，所有更新器共用
+            self.exclude_matcher = ExcludeMatcher(exclude_files)
 
         self.scheme_type = config.get('scheme_type', 'pro')
         if self.scheme_type == 'base':
@@ -627,12 +921,14 @@ class ConfigManager:
 
 
 class FileChecker:
-    def __init__(self, owner, repo, pattern, use_mirror, tag=None):
+    def __init__(self, owner, repo, pattern, use_mirror, tag=None, catalog=None, http=None):
         self.owner = owner
         self.repo = repo
         self.pattern_regex = re.compile(pattern.replace('*', '.*'))
         self.tag = tag
         self.use_mirror = use_mirror
+        self.catalog = catalog or ReleaseCatalog()
+        self.http = http or HttpTransport()
 
     def get_latest_file(self) -> Optional[str]:
         """获取匹配模式的最新文件"""
@@ -658,17 +954,22 @@ class FileChecker:
             # 获取所有Release（按时间排序）
             url = f"https://api.github.com/repos/{self.owner}/{self.repo}/releases"
         
-        response = requests.get(url)
-        response.raise_for_status()
+        def fetch():
+            response = self.http.get(url)
+            response.raise_for_status()
+            return response.json()
+        data = self.catalog.get(url, fetch)
         # 返回结果处理：指定标签时为单个Release，否则为列表
-        return [response.json()] if self.tag else response.json()
+        return [data] if self.tag else data
     
     def _get_cnb_releases(self) -> Dict:
         headers = CNB_HEADERS
         url = f'https://cnb.cool/{self.owner}/{self.repo}/-/releases'
-        response = requests.get(url=url, headers=headers)
-        if response.status_code == 200:
-            releases_all = response.json()
+        def fetch():
+            response = self.http.get(url, headers=headers)
+            return response.json() if response.status_code == 200 else None
+        releases_all = self.catalog.get(url, fetch)
+        if releases_all:
             releases_list = releases_all['releases']
             for release in releases_list:
                 if self.tag:
@@ -679,9 +980,687 @@ class FileChecker:
         return {}
         
 
+# ====================== 发布信息缓存 ======================
+class ReleaseCatalog:
+    """发布信息目录：一次运行内按URL共享发布列表，供各更新器及FileChecker复用"""
+    def __init__(self, ttl=0):
+        """
+        Args:
+            ttl (int): 缓存有效期（秒），0表示本次运行内一直有效
+        """
+        self.ttl = ttl
+        self._entries = {}  # url → (获取时间, 响应数据)
+        self._failed = set()  # 本轮更新检查中已确认请求失败的URL（检查结束即清除）
+
+    def get(self, url, fetch):
+        """
+        获取URL对应的发布信息，未命中或已过期时调用fetch()获取
+        Args:
+            url (str): 发布信息URL
+            fetch (callable): 实际发起请求的函数，返回None表示获取失败（失败结果不缓存）
+        """
+        entry = self._entries.get(url)
+        if entry and (self.ttl <= 0 or time.time() - entry[0] < self.ttl):
+            return entry[1]
+        if url in self._failed:
+            return None
+        data = fetch()
+        if data is not None:
+            self._entries[url] = (time.time(), data)
+        return data
+
+    def mark_failed(self, url) -> None:
+        """记录请求失败的URL，清除前get()直接返回None而不再重复请求"""
+        self._failed.add(url)
+
+    def clear_failures(self) -> None:
+        """清除失败记录，之后的get()重新请求这些URL"""
+        self._failed.clear()
+
+
+class MetadataCache:
+    """发布信息缓存：按URL保存ETag/Last-Modified及响应内容，用于发送条件请求"""
+    _lock = threading.Lock()  # 并发检查更新时串行化缓存文件的读写
+
+    def __init__(self, cache_dir):
+        self.cache_file = os.path.join(cache_dir, "api_cache.json")
+
+    def _load(self) -> Dict:
+        """读取缓存文件，损坏或不存在时返回空缓存"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def conditional_headers(self, url) -> Dict[str, str]:
+        """生成条件请求头（If-None-Match / If-Modified-Since）"""
+        entry = self._load().get(url)
+        headers = {}
+        if not entry or "body" not in entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_body(self, url) -> Optional[object]:
+        """获取缓存的响应内容（收到304时复用）"""
+        entry = self._load().get(url)
+        return entry.get("body") if entry else None
+
+    def store(self, url, response, body) -> None:
+        """
+        保存响应的校验信息及内容
+        Args:
+            url (str): 请求URL
+            response (requests.Response): 响应对象
+            body: 已解析的JSON内容
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        # 服务器未提供任何校验信息时无法发送条件请求，不做缓存
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            # 写入前重新读取，避免多个更新器互相覆盖缓存条目
+            entries = self._load()
+            entries[url] = {
+                "etag": etag or "",
+                "last_modified": last_modified or "",
+                "fetched_at": time.time(),
+                "body": body
+            }
+            temp_file = self.cache_file + ".tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(temp_file, self.cache_file)
+            except Exception as e:
+                print_warning(f"保存发布信息缓存失败: {str(e)}")
+
+
+class DigestCache:
+    """
+    文件摘要缓存：以路径、大小、修改时间(ns)和inode标识文件，文件未变化时直接返回记录的SHA256
+    标识任一项变化即视为失效；写入时清理已不存在的文件，并按最近使用时间保留最多max_entries条
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir, max_entries=DIGEST_CACHE_MAX_ENTRIES):
+        self.cache_file = os.path.join(cache_dir, "digest_cache.json")
+        self.max_entries = max_entries
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _identity(path) -> Optional[List[int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def _save(self, entries) -> None:
+        """先写临时文件再替换，避免中断时留下损坏的缓存文件"""
+        temp_file = self.cache_file + ".tmp"
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print_warning(f"保存文件摘要缓存失败: {str(e)}")
+
+    def get(self, path) -> Optional[str]:
+        """文件未变化时返回缓存的SHA256（并刷新最近使用时间），否则返回None"""
+        key = os.path.abspath(path)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if not entry or entry.get("identity") != self._identity(path):
+                return None
+            entry["used"] = time.time()
+            self._save(entries)
+        return entry.get("sha256")
+
+    def put(self, path, digest) -> None:
+        """记录文件当前标识对应的SHA256"""
+        identity = self._identity(path)
+        if not identity or not digest:
+            return
+        with self._lock:
+            entries = self._load()
+            entries[os.path.abspath(path)] = {"identity": identity, "sha256": digest, "used": time.time()}
+            # 清理失效条目并限制缓存大小
+            entries = {key: value for key, value in entries.items() if os.path.exists(key)}
+            if len(entries) > self.max_entries:
+                keep = sorted(entries, key=lambda key: entries[key].get("used", 0), reverse=True)[:self.max_entries]
+                entries = {key: entries[key] for key in keep}
+            self._save(entries)
+
+
+class SourceSelector:
+    """下载源选择：探测各下载源的首段数据吞吐，结合历史吞吐记录选择最快的源"""
+    _lock = threading.Lock()
+    history_weight = 0.5   # 选择时历史吞吐所占权重
+    smoothing = 0.3        # 历史吞吐的指数平滑系数
+
+    def __init__(self, http, cache_dir):
+        self.http = http
+        self.stats_file = os.path.join(cache_dir, "source_stats.json")
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def probe(self, url) -> Optional[float]:
+        """读取下载地址的前 SOURCE_PROBE_BYTES 字节，返回吞吐（字节/秒），失败返回None"""
+        start = time.time()
+        received = 0
+        try:
+            headers = {'Range': f'bytes=0-{SOURCE_PROBE_BYTES - 1}'}
+            with self.http.get(url, headers=headers, stream=True) as response:
+                if response.status_code not in (200, 206):
+                    return None
+                for data in response.iter_content(65536):
+                    received += len(data)
+                    if received >= SOURCE_PROBE_BYTES:
+                        break
+        except requests.RequestException:
+            return None
+        return received / max(time.time() - start, 1e-3)
+
+    def choose(self, mirrors: Dict[str, str]) -> Tuple[str, str]:
+        """
+        从多个下载源中选择最快的一个
+        Args:
+            mirrors (dict): 下载源名称 → 下载地址
+        Returns:
+            Tuple[str, str]: 下载源名称，下载地址
+        """
+        names = list(mirrors)
+        with ThreadPoolExecutor(max_workers=MEMORY.workers(len(names))) as executor:
+            probes = dict(zip(names, executor.map(lambda name: self.probe(mirrors[name]), names)))
+        history = self._load()
+        scores = {}
+        for name, measured in probes.items():
+            if measured is None:
+                continue
+            past = history.get(name, {}).get("throughput")
+            scores[name] = measured if not past else (1 - self.history_weight) * measured + self.history_weight * past
+        if not scores:
+            # 探测全部失败时按历史记录选择，没有记录则使用第一个
+            scores = {name: history.get(name, {}).get("throughput", 0) for name in names}
+        best = max(scores, key=scores.get)
+        return best, mirrors[best]
+
+    def record(self, name, size, seconds) -> None:
+        """记录一次实际下载的吞吐，用于之后的选择"""
+        if size <= 0 or seconds <= 0:
+            return
+        throughput = size / seconds
+        with self._lock:
+            stats = self._load()
+            past = stats.get(name, {}).get("throughput")
+            stats[name] = {
+                "throughput": throughput if not past else self.smoothing * throughput + (1 - self.smoothing) * past,
+                "updated_at": time.time()
+            }
+            try:
+                with open(self.stats_file, 'w', encoding='utf-8') as f:
+                    json.dump(stats, f)
+            except Exception as e:
+                print_warning(f"保存下载源记录失败: {str(e)}")
+
+
+# ====================== 排除规则 ======================
+class ExcludeMatcher:
+    """
+    排除规则匹配器：完整路径或文件名匹配任一规则即排除
+    不含通配符的规则放入查找表，其余规则合并为一个锚定的正则，判断开销与规则数量无关
+    """
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self.literals: Set[str] = set()
+        globs = []
+        for pattern in self.patterns:
+            if any(char in pattern for char in '*?['):
+                globs.append(fnmatch.translate(self.normalize(pattern)))
+            else:
+                self.literals.add(self.normalize(pattern))
+        self.regex = re.compile('|'.join(globs)) if globs else None
+
+    @staticmethod
+    def normalize(path) -> str:
+        """统一路径分隔符与大小写（Windows不区分大小写）"""
+        return os.path.normcase(os.path.normpath(path.replace('/', os.sep)))
+
+    def match(self, path) -> bool:
+        """
+        Args:
+            path (str): 压缩包内路径或安装目录下的相对路径（'/'分隔）
+        """
+        if not self.patterns:
+            return False
+        normalized_path = self.normalize(path)
+        basename = os.path.basename(normalized_path)
+        if normalized_path in self.literals or basename in self.literals:
+            return True
+        return self.regex is not None and bool(self.regex.match(normalized_path) or self.regex.match(basename))
+
+
+# ====================== 压缩包索引 ======================
+class ZipMember:
+    """压缩包成员：解码后的路径及中央目录中的CRC、大小与偏移"""
+    __slots__ = ('name', 'crc', 'size', 'compress_size', 'header_offset', 'info')
+
+    def __init__(self, name, info: zipfile.ZipInfo):
+        self.name = name
+        self.crc = info.CRC
+        self.size = info.file_size
+        self.compress_size = info.compress_size
+        self.header_offset = info.header_offset
+        self.info = info  # 读取成员数据时使用
+
+
+class ZipIndex:
+    """
+    压缩包索引：每个压缩包在一次运行中只打开一次、中央目录只解析一次、文件名只解码一次
+    清理、差异比较和解压共用同一索引，暂存阶段结束后调用close_all释放文件句柄
+    """
+    _cache: Dict = {}  # 缓存键 → ZipIndex
+    _lock = threading.Lock()
+
+    def __init__(self, source, stamp=None):
+        self.source = source  # 文件路径或HttpRangeFile
+        self.stamp = stamp    # 本地文件的(大小, 修改时间)，文件变化后重新解析
+        self.zip = zipfile.ZipFile(source, 'r')
+        self.members: List[ZipMember] = []
+        for info in self.zip.infolist():
+            if info.is_dir():
+                continue
+            try:
+                decoded_name = info.filename.encode('cp437').decode('utf-8')
+            except:
+                decoded_name = info.filename
+            self.members.append(ZipMember(decoded_name, info))
+
+    @classmethod
+    def open(cls, source) -> 'ZipIndex':
+        """
+        获取压缩包的索引（已解析过的直接复用）
+        Args:
+            source (str|HttpRangeFile): 压缩文件路径（或远程压缩包文件对象）
+        """
+        if isinstance(source, str):
+            key = os.path.abspath(source)
+            stat = os.stat(key)
+            stamp = (stat.st_size, stat.st_mtime_ns)
+        else:
+            # 远程压缩包以文件对象本身区分（缓存持有该对象，id不会被复用）
+            key, stamp = id(source), None
+        with cls._lock:
+            index = cls._cache.get(key)
+            if index is None or index.stamp != stamp:
+                if index is not None:
+                    index.zip.close()
+                index = cls(source, stamp)
+                cls._cache[key] = index
+            return index
+
+    @classmethod
+    def close_all(cls) -> None:
+        """关闭所有已打开的压缩包（之后才能移动或删除这些文件）"""
+        with cls._lock:
+            for index in cls._cache.values():
+                index.zip.close()
+            cls._cache.clear()
+
+
+# ====================== 安装清单 ======================
+class InstallManifest:
+    """安装清单：记录解压安装的每个文件（相对路径 → 大小、CRC32、修改时间）"""
+    def __init__(self, manifest_file, files=None):
+        self.manifest_file = manifest_file
+        self.files: Dict[str, Dict] = files or {}
+
+    @classmethod
+    def load(cls, manifest_file) -> 'InstallManifest':
+        """读取清单，不存在或损坏时返回空清单"""
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(manifest_file, data.get("files", {}))
+        except Exception:
+            return cls(manifest_file)
+
+    def entries(self) -> Dict[str, Tuple[int, int]]:
+        """相对路径 → (大小, CRC)，供差异比较"""
+        return {path: (entry.get("size"), entry.get("crc")) for path, entry in self.files.items()}
+
+    def is_unchanged(self, relative_path, target_path, size, crc) -> bool:
+        """压缩包成员与清单记录一致，且磁盘上的文件自安装后未被改动"""
+        entry = self.files.get(relative_path)
+        if not entry or entry.get("size") != size or entry.get("crc") != crc:
+            return False
+        try:
+            stat = os.stat(target_path)
+        except OSError:
+            return False
+        return stat.st_size == size and stat.st_mtime_ns == entry.get("mtime_ns")
+
+    def save(self) -> None:
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.files}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_file, self.manifest_file)
+
+
+def _parent_dirs(key) -> List[str]:
+    """'/'分隔的相对路径的所有上级目录（由近及远，不含根目录）"""
+    parts = key.split('/')[:-1]
+    return ['/'.join(parts[:i]) for i in range(len(parts), 0, -1)]
+
+
+def _path_key(path) -> str:
+    """用于比较的规范化绝对路径（Windows下不区分大小写）"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def scan_tree(root, keys) -> Tuple[Set[str], Set[str]]:
+    """
+    一次os.scandir遍历获取磁盘上实际存在的文件，只进入keys涉及的目录
+    Args:
+        root (str): 安装目录
+        keys (iterable): '/'分隔的相对路径
+    Returns:
+        tuple: (存在的文件相对路径, 未进入的子目录相对路径)
+    """
+    wanted_dirs = {parent for key in keys for parent in _parent_dirs(key)}
+    files, skipped_dirs = set(), set()
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        try:
+            iterator = os.scandir(os.path.join(root, relative_dir) if relative_dir else root)
+        except OSError:
+            continue
+        with iterator:
+            for entry in iterator:
+                key = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    (stack.append if key in wanted_dirs else skipped_dirs.add)(key)
+                else:
+                    files.add(key)
+    return files, skipped_dirs
+
+
+class ManifestDiff:
+    """文件清单差异：以集合运算比较新旧版本的{相对路径: (大小, CRC)}"""
+    def __init__(self, added: Set[str], removed: Set[str], changed: Set[str], unchanged: Set[str]):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+        self.unchanged = unchanged
+
+    @classmethod
+    def compare(cls, old_entries: Dict[str, Tuple], new_entries: Dict[str, Tuple]) -> 'ManifestDiff':
+        common = old_entries.keys() & new_entries.keys()
+        changed = {key for key in common if old_entries[key] != new_entries[key]}
+        return cls(
+            added=new_entries.keys() - old_entries.keys(),
+            removed=old_entries.keys() - new_entries.keys(),
+            changed=changed,
+            unchanged=common - changed
+        )
+
+    def cleanup_paths(self, root, is_excluded) -> Tuple[List[str], List[str]]:
+        """
+        获取需要清理的旧文件及目录
+        Args:
+            root (str): 安装目录
+            is_excluded (callable): 排除规则判断（排除的文件保留）
+        Returns:
+            tuple: (新版本中已移除、仍存在且未被排除的文件, 清理后不再包含任何文件的旧目录)
+        """
+        existing, skipped_dirs = scan_tree(root, self.removed)
+        removed = {key for key in self.removed if key in existing and not is_excluded(key)}
+        # 新版本仍在使用、或清理后仍有其他文件的目录不能删除
+        kept = self.added | self.changed | self.unchanged
+        occupied = {parent for key in kept | (existing - removed) | skipped_dirs for parent in _parent_dirs(key)}
+        occupied |= skipped_dirs
+        candidates = {parent for key in removed for parent in _parent_dirs(key)} - occupied
+        # 只保留最上层的目录（删除上层目录时一并删除下层）
+        dirs = [d for d in candidates if not any(parent in candidates for parent in _parent_dirs(d))]
+        in_dirs = lambda key: any(parent in candidates for parent in _parent_dirs(key))
+        return (
+            sorted(os.path.join(root, os.path.normpath(key)) for key in removed if not in_dirs(key)),
+            sorted(os.path.join(root, os.path.normpath(d)) for d in dirs)
+        )
+
+
+class StagedInstall:
+    """暂存安装：新文件先完整解压并校验到暂存目录，提交时才在目标目录中逐个替换（可回滚）"""
+    def __init__(self, target_dir, staging_dir, manifest=None):
+        self.target_dir = target_dir
+        self.staging_dir = staging_dir
+        self.backup_dir = staging_dir + "_backup"
+        self.manifest = manifest
+        self.written = []    # [(清单键, 暂存路径, 目标路径, 大小, CRC)]
+        self.installed = {}  # 未变化的文件沿用清单记录
+        self.stale = []      # 提交时删除的已移除文件
+        self.old_files = []  # 提交时删除的上个版本文件
+        self.old_dirs = []   # 提交时删除的上个版本目录
+        self.dirs = []       # 提交前需要创建的目标目录
+        self.skipped = 0
+        self.journal = []    # 已执行的替换[(目标路径, 备份路径)]，备份路径为None表示新增文件
+
+    def staged_path(self, manifest_key) -> str:
+        return os.path.join(self.staging_dir, os.path.normpath(manifest_key))
+
+    def targets(self) -> Set[str]:
+        """提交时将写入或删除的目标文件（规范化路径）"""
+        paths = [target_path for _, _, target_path, _, _ in self.written] + self.stale + self.old_files
+        return {_path_key(path) for path in paths}
+
+    def _backup(self, path) -> None:
+        """将被替换或删除的文件/目录移入备份目录，以便回滚"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        backup = os.path.join(self.backup_dir, str(len(self.journal)))
+        os.replace(path, backup)
+        self.journal.append((path, backup))
+
+    def commit(self) -> None:
+        """提交暂存的文件：移走旧文件后用重命名替换目标文件"""
+        for file_dir in self.old_dirs:
+            if os.path.isdir(file_dir):
+                self._backup(file_dir)
+        for file in self.old_files + self.stale:
+            if os.path.isfile(file):
+                self._backup(file)
+        for directory in self.dirs:
+            os.makedirs(directory, exist_ok=True)
+        for manifest_key, staged_path, target_path, size, crc in self.written:
+            if os.path.isfile(target_path):
+                self._backup(target_path)
+            else:
+                self.journal.append((target_path, None))
+            os.replace(staged_path, target_path)
+            self.installed[manifest_key] = {
+                "size": size,
+                "crc": crc,
+                "mtime_ns": os.stat(target_path).st_mtime_ns
+            }
+
+    def rollback(self) -> None:
+        """按相反顺序撤销已执行的替换"""
+        for target_path, backup in reversed(self.journal):
+            if os.path.isfile(target_path):
+                os.remove(target_path)
+            if backup is not None:
+                os.replace(backup, target_path)
+        self.journal = []
+
+    def finalize(self) -> None:
+        """提交成功后保存安装清单并清理暂存与备份"""
+        if self.manifest is not None:
+            self.manifest.files = self.installed
+            self.manifest.save()
+        self.discard()
+
+    def discard(self) -> None:
+        """删除暂存目录及备份"""
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        shutil.rmtree(self.backup_dir, ignore_errors=True)
+
+
+class StagedFile:
+    """暂存的单个文件（已下载校验完毕），提交时替换目标文件（可回滚）"""
+    def __init__(self, temp_path, target_path, backup_path):
+        self.temp_path = temp_path
+        self.target_path = target_path
+        self.backup_path = backup_path
+        self.has_backup = False
+        self.replaced = False
+
+    def targets(self) -> Set[str]:
+        """提交时将写入的目标文件（规范化路径）"""
+        return {_path_key(self.target_path)}
+
+    def commit(self) -> None:
+        if os.path.exists(self.target_path):
+            os.replace(self.target_path, self.backup_path)
+            self.has_backup = True
+        os.replace(self.temp_path, self.target_path)  # 原子操作更安全
+        self.replaced = True
+
+    def rollback(self) -> None:
+        if self.replaced:
+            os.replace(self.target_path, self.temp_path)
+            self.replaced = False
+        if self.has_backup:
+            os.replace(self.backup_path, self.target_path)
+            self.has_backup = False
+
+    def finalize(self) -> None:
+        self.discard()
+
+    def discard(self) -> None:
+        if os.path.exists(self.backup_path):
+            os.remove(self.backup_path)
+
+
+class UpdateSession:
+    """
+    更新会话：各组件先在输入法运行期间完成暂存，随后只停止一次服务统一提交
+    任一组件暂存或提交失败时，已提交的组件全部回滚
+    """
+    def __init__(self):
+        self.service_stopped = False
+
+    def install(self, updaters) -> Dict:
+        """
+        安装已下载的组件
+        Args:
+            updaters (list): 已完成下载的更新器
+        Returns:
+            dict: 更新器 → 结果（1: 更新成功，-1: 更新失败）
+        """
+        staged = []
+        # 按提交顺序暂存：后提交的组件需知道先提交的组件会改写哪些文件（方案压缩包同样包含词库文件）
+        claimed = set()
+        for updater in updaters:
+            print_subheader(f"准备{updater.component_name}文件")
+            try:
+                change = updater.stage_install(claimed)
+                staged.append((updater, change))
+                claimed |= change.targets()
+            except Exception as e:
+                print_error(f"{updater.component_name}安装失败: {str(e)}")
+                ZipIndex.close_all()
+                updater.abort_install()
+                for _, change in staged:
+                    change.discard()
+                return {updater: -1 for updater in updaters}
+        # 暂存阶段共用的压缩包索引到此为止，释放句柄以便之后移动或删除压缩包
+        ZipIndex.close_all()
+
+        # 维护窗口：只停止一次输入法服务，依次提交所有组件
+        start = time.perf_counter()
+        committed = []
+        service_owner = None
+        try:
+            for updater, _ in staged:
+                if hasattr(updater, 'terminate_processes'):
+                    updater.terminate_processes()
+                    self.service_stopped = True
+                    service_owner = updater
+                    break
+            for _, change in staged:
+                committed.append(change)
+                change.commit()
+        except Exception as e:
+            print_error(f"提交更新失败，正在回滚: {str(e)}")
+            for change in reversed(committed):
+                try:
+                    change.rollback()
+                except Exception as err:
+                    print_error(f"回滚失败: {str(err)}")
+            for _, change in staged:
+                change.discard()
+            # 文件已恢复为旧版本，无需重新部署，但不能让输入法一直处于停止状态
+            self._restart_service(service_owner)
+            return {updater: -1 for updater in updaters}
+        finally:
+            note = "（期间输入法服务停止）" if service_owner is not None else ""
+            print(f"{COLOR['OKBLUE']}[i] 提交更新耗时 {time.perf_counter() - start:.2f} 秒{note}{COLOR['ENDC']}")
+
+        results = {}
+        for updater, change in staged:
+            try:
+                change.finalize()
+                updater.finish_install()
+                results[updater] = 1
+            except Exception as e:
+                print_error(f"{updater.component_name}更新记录保存失败: {str(e)}")
+                results[updater] = -1
+        if -1 in results.values():
+            # 存在失败时调用方不会部署，需在此恢复输入法服务
+            self._restart_service(service_owner)
+        MEMORY.report()
+        return results
+
+    def _restart_service(self, service_owner) -> None:
+        """重新启动本次会话停止的输入法服务"""
+        if service_owner is None:
+            return
+        try:
+            service_owner.start_service()
+            self.service_stopped = False
+        except Exception as err:
+            print_error(f"重新启动输入法服务失败，请手动启动: {str(err)}")
+
+
 # ====================== 更新基类 ======================
 class UpdateHandler:
     """更新系统核心基类"""
+    component_name = "组件"
+    update_title = "更新流程"
+    staging_name = "staging"  # 暂存目录名（位于UpdateCache中）
+    owns_install_dir = False  # 安装目录是否只存放本组件的文件（决定根目录下的多余文件是否报告）
+
     def __init__(self, config_manager):
         """
         初始化更新处理器
@@ -690,6 +1669,7 @@ class UpdateHandler:
             first_download (bool): 是否是第一次下载，用于传递给load_config方法，默认False，需手动设置为True
         """
         self.config_manager = config_manager
+        self.http = config_manager.http
         (
             self.engine,
             self.scheme_type,
@@ -699,6 +1679,7 @@ class UpdateHandler:
             self.github_token,
             self.exclude_files
         ) = config_manager.load_config(show=False)
+        self.exclude_matcher = config_manager.exclude_matcher
         (
             self.custom_dir,
             self.extract_path,
@@ -706,7 +1687,12 @@ class UpdateHandler:
             self.weasel_server
         ) = self.get_all_dir()
         os.makedirs(self.custom_dir, exist_ok=True)
+        self.metadata_cache = MetadataCache(self.custom_dir)
+        self.source_selector = SourceSelector(self.http, self.custom_dir)
+        self.digest_cache = DigestCache(self.custom_dir)
         self.update_info = None
+        self.pending = None  # 待下载信息，由prepare_download生成
+        self.download_digests = {}  # 下载文件路径 → 下载过程中计算的SHA256
 
     def has_update(self) -> bool:
         """检查是否有更新可用"""
@@ -738,104 +1724,36 @@ class UpdateHandler:
     
     def get_old_file_list(self, old_exists_temp_zip: str, new_temp_zip: str, is_dict: bool = False) -> Tuple[List[str], List[str]]:
         """
-        获取旧版本压缩包中的文件路径（用于清理）
+        对比新旧版本压缩包，获取新版本中已移除的文件路径（用于清理）
         
         Args:
             old_exists_temp_zip: 旧版本 zip 压缩包路径
             new_temp_zip: 新版本 zip 压缩包路径
-            is_dict: 是否是词库（词库路径不同，处理略有区别）
+            is_dict: 是否是词库（词库解压到词库目录）
     
         Returns:
             Tuple:
-                - 所有应删除的旧文件（非排除项）
-                - 新版本中不再使用的文件或目录路径
+                - 新版本中已移除、且仍存在的旧文件（非排除项）
+                - 清理后不再包含任何文件的旧目录
         """
-        def is_file(path): return os.path.isfile(path)
-        def is_dir(path): return os.path.isdir(path)
-    
-        whole_old_file_paths: List[str] = []
-        should_delete_paths: List[str] = []
-        
-        old_members = new_members = []
+        extract_path = self.dict_extract_path if is_dict else self.extract_path
+        if not os.path.isfile(old_exists_temp_zip):
+            # 首次安装，没有需要清理的旧文件
+            return [], []
         try:
-            with zipfile.ZipFile(old_exists_temp_zip, 'r') as old_zip:
-                for i in old_zip.namelist():
-                    try:
-                        old_members.append(i.encode('cp437').decode('utf-8'))
-                    except:
-                        old_members.append(i)
-    
-            if new_temp_zip and os.path.isfile(new_temp_zip):
-                with zipfile.ZipFile(new_temp_zip, 'r') as new_zip:
-                    for i in new_zip.namelist():
-                        try:
-                            new_members.append(i.encode('cp437').decode('utf-8'))
-                        except:
-                            new_members.append(i)
-    
-            # 处理词库情况下的路径差异
-            if is_dict:
-                # 去除可能有的目录前缀
-                new_members = [m.split('/')[-1] for m in new_members if m.split('/')[-1]]
-                old_members = [m.split('/')[-1] for m in old_members if m.split('/')[-1]]
-    
-            # 新版本中不再包含的旧文件
-            should_delete_members = [m for m in old_members if m not in new_members]
-    
-            extract_path = self.dict_extract_path if is_dict else self.extract_path
-    
-            # 所有旧文件路径
-            whole_old_file_paths = [
-                path for path in (os.path.join(extract_path, name) for name in old_members)
-                if is_file(path)
-            ]
-            
-            # 判断函数根据 is_dict 选择
-            check_func = is_file if is_dict else is_dir
-            
-            # 新版本中不再使用的文件/目录路径
-            should_delete_paths = [
-                path for path in (os.path.join(extract_path, name) for name in should_delete_members)
-                if check_func(path)
-            ]
-    
-            # 排除指定不删除文件
-            if getattr(self, "exclude_files", []):
-                excluded = []
-                for ex in self.exclude_files:
-                    excluded.extend([f for f in whole_old_file_paths if ex in f])
-    
-                if excluded:
-                    print("以下为排除文件不删除：", ", ".join(excluded))
-                    whole_old_file_paths = [f for f in whole_old_file_paths if f not in excluded]
-    
+            old_entries = self.archive_entries(old_exists_temp_zip)
+            new_entries = self.archive_entries(new_temp_zip) if new_temp_zip and os.path.isfile(new_temp_zip) else {}
+            return ManifestDiff.compare(old_entries, new_entries).cleanup_paths(extract_path, self.exclude_matcher.match)
         except Exception as e:
             print_warning(f"无法获取需要清理的旧文件或目录：{e}")
-    
-        return whole_old_file_paths, should_delete_paths
+            return [], []
 
-            
-    def _delete_old_files(self, old_file_list: List, old_dir_list: List) -> None:
-        """
-        获取旧的压缩包文件
-        Args:
-            old_file_list: 获取到的需要删除的文件列表
-        """
-        if hasattr(self, 'terminate_processes'):
-            # 终止进程
-            self.terminate_processes()
-        # 移除不再使用的文件夹
-        for file_dir in old_dir_list:
-            if os.path.exists(file_dir):
-                shutil.rmtree(file_dir)
-        # 移除旧版本文件
-        for file in old_file_list:
-            if os.path.exists(file):
-                os.remove(file)
+    def archive_entries(self, zip_path) -> Dict[str, Tuple[int, int]]:
+        """压缩包中安装的文件：相对路径（与安装清单一致） → (大小, CRC)"""
+        members, _ = self.archive_members(ZipIndex.open(zip_path))
+        return {key: (member.size, member.crc) for key, member in members}
 
-        
-    
-    def save_record(self, record_file: str, property_type: str, property_name: str, info: dict) -> None:
+    def save_record(self, record_file: str, property_type: str, property_name: str, info: dict, fingerprint=None) -> None:
         """
         保存更新记录
         Args:
@@ -843,6 +1761,7 @@ class UpdateHandler:
             property_type: 类型：方案、词库、模型
             property_name: 名称：写入文件的方案、词库、模型名称（来自GitHub）
             info: 保存的信息
+            fingerprint: 下载前获取的远端文件指纹（ETag、大小）
         """
         # 保存记录
         with open(record_file, 'w') as f:
@@ -852,187 +1771,826 @@ class UpdateHandler:
                 "tag": info.get("tag", ""),
                 "apply_time": datetime.now(timezone.utc).isoformat(),
                 "sha256": info.get("sha256", ""),
-                "cnb_id": info.get("id", "")
+                "cnb_id": info.get("id", ""),
+                "fingerprint": fingerprint or {}
             }, f)
         
 
-    def remote_api_request(self, url, use_mirror=False, output_json=True) -> Optional[Dict]:
+    def remote_api_request(self, url, use_mirror=False, output_json=True, timeout=None) -> Optional[Dict]:
+        """
+        API请求（JSON结果经发布信息目录共享，同一次运行内不重复请求）
+        Args:
+            url (str): API请求的URL
+            timeout (int): 请求超时（秒），None时使用传输层默认超时
+        Returns:
+            dict: API响应的JSON数据
+        """
+        if not output_json:
+            return self._remote_api_request(url, use_mirror, output_json, timeout)
+        data = self.config_manager.release_catalog.get(
+            url, lambda: self._remote_api_request(url, use_mirror, timeout=timeout)
+        )
+        if data is not None and use_mirror:
+            return data['releases']
+        return data
+
+    def _remote_api_request(self, url, use_mirror=False, output_json=True, timeout=None) -> Optional[Dict]:
         """
-        带令牌认证的API请求
+        带令牌认证的API请求（JSON请求会携带ETag/Last-Modified条件头，304时复用本地缓存）
         Args:
             url (str): API请求的URL
+            timeout (int): 请求超时（秒），None时使用传输层默认超时
         Returns:
             dict: API响应的JSON数据
         """
         if use_mirror:
-            headers = CNB_HEADERS
+            headers = dict(CNB_HEADERS)
         else:
             headers = {"User-Agent": "RIME-Updater/1.0"}
             if self.github_token:
                 headers["Authorization"] = f"Bearer {self.github_token}"
         
-        max_retries = 2
-        for attempt in range(max_retries + 1):
-            try:
-                response = requests.get(url, headers=headers)
+        # 连接失败与服务端错误的重试由传输层按退避策略处理
+        options = {'timeout': timeout} if timeout is not None else {}
+        try:
+            request_headers = dict(headers)
+            if output_json:
+                request_headers.update(self.metadata_cache.conditional_headers(url))
+            response = self.http.get(url, headers=request_headers, **options)
+            if not output_json:
                 response.raise_for_status()
-                if output_json:
-                    if use_mirror:
-                        releases_list = response.json()['releases']
-                        return releases_list
-                    return response.json()
-                else:
-                    return response
-                
-            except requests.HTTPError as e:
-                if e.response.status_code == 401:
-                    print_error("GitHub令牌无效或无权限")
-                elif e.response.status_code == 403:
-                    print_error("权限不足或触发次级速率限制")
-                else:
-                    print_error(f"HTTP错误: {e.response.status_code}")
-                return None
-            except requests.ConnectionError:
-                print_error("网络连接失败")
-                if attempt < max_retries:
-                    time.sleep(5)
-                    continue
-                return None
-            except requests.RequestException as e:
-                print_error(f"请求异常: {str(e)}")
-                return None
-        
-        return None
+                return response
+
+            data = None
+            if response.status_code == 304:
+                data = self.metadata_cache.get_body(url)
+                if data is None:
+                    # 缓存内容丢失，重新发起完整请求
+                    response = self.http.get(url, headers=headers, **options)
+            if data is None:
+                response.raise_for_status()
+                data = response.json()
+                self.metadata_cache.store(url, response, data)
+            return data
+            
+        except requests.HTTPError as e:
+            if e.response.status_code == 401:
+                print_error("GitHub令牌无效或无权限")
+            elif e.response.status_code == 403:
+                print_error("权限不足或触发次级速率限制")
+            else:
+                print_error(f"HTTP错误: {e.response.status_code}")
+            return None
+        except requests.Timeout:
+            print_error("网络请求超时")
+            return None
+        except requests.ConnectionError:
+            print_error("网络连接失败")
+            return None
+        except requests.RequestException as e:
+            print_error(f"请求异常: {str(e)}")
+            return None
 
 
-    def download_file(self, url, save_path, is_continue) -> bool:
+    def download_file(self, url, save_path, is_continue, progress=None, expected_sha256=None) -> bool:
         """
         带进度显示的稳健下载
+        续传时携带 If-Range（上次响应的ETag/Last-Modified），只有服务器返回206且
+        Content-Range起点与本地大小一致时才追加写入，否则截断文件重新下载。
+        下载过程中同步计算SHA256（结果记录在self.download_digests中），无需再次读取文件
         Args:
             url (str): 下载链接
             save_path (str): 保存路径
             is_continue (bool): 是否断点续传
+            progress (DownloadProgress): 共享的汇总进度条（并发下载时传入）
+            expected_sha256 (str): 期望的SHA256（GitHub digest），不一致时删除文件并返回失败
         """
+        resume_file = save_path + ".resume.json"
         try:
-            # 统一提示使用cnb或GitHub状态
-            if self.use_mirror:
-                print(f"{COLOR['OKBLUE']}[i] 正在使用 https://cnb.cool 下载{COLOR['ENDC']}")
-                # print(f"{COLOR['WARNING']}注意: 如果使用代理，请确保关闭后再尝试下载{COLOR['ENDC']}")
-            else:
-                print(f"{COLOR['OKCYAN']}[i] 正在使用 https://github.com 下载{COLOR['ENDC']}")
+            # 统一提示使用cnb或GitHub状态（并发下载时由调用方统一提示）
+            if progress is None:
+                print_download_source('cnb.cool' in url)
 
             headers = {}
             # 获取已下载进度
-            if is_continue:
+            if is_continue and os.path.exists(save_path):
                 downloaded = os.path.getsize(save_path)
             else:
                 downloaded = 0
-            headers['Range'] = f'bytes={downloaded}-'
+            if downloaded:
+                headers['Range'] = f'bytes={downloaded}-'
+                validator = self._load_resume_validator(resume_file)
+                if validator:
+                    headers['If-Range'] = validator
             
-            response = requests.get(url, headers=headers, stream=True)
-            total_size = int(response.headers.get('content-length', 0)) + downloaded
-            block_size = 8192
-            
-            # 使用 tqdm 包装响应内容的迭代器
-            with open(save_path, 'ab') as f:
-                # tqdm 的 total 参数设置为文件总大小，单位为字节
-                with tqdm(total=total_size, initial=downloaded, unit='B', unit_scale=True, desc="下载中") as pbar:
-                    for data in response.iter_content(block_size): 
-                        f.write(data)
-                        pbar.update(len(data))  # 更新进度条
-            return True
+            with self.http.get(url, headers=headers, stream=True) as response:
+                content_range = response.headers.get('Content-Range', '')
+                if downloaded and response.status_code == 416:
+                    # 请求范围超出文件大小：本地文件已完整或远端文件已变化
+                    match = re.match(r'bytes\s+\*/(\d+)', content_range)
+                    if match and int(match.group(1)) == downloaded:
+                        self._remove_file(resume_file)
+                        return self._verify_download(save_path, calculate_sha256(save_path), expected_sha256)
+                    print_warning("无法续传，重新下载")
+                    return self.download_file(url, save_path, False, progress=progress, expected_sha256=expected_sha256)
+                response.raise_for_status()
+
+                match = re.match(r'bytes\s+(\d+)-\d+/(\d+|\*)', content_range)
+                if downloaded and response.status_code == 206 and match and int(match.group(1)) == downloaded:
+                    mode = 'ab'
+                    total_size = int(match.group(2)) if match.group(2) != '*' else 0
+                elif response.status_code == 206:
+                    # 返回的分块不是从本地大小开始（或服务器限制了范围大小）：分块内容不能作为完整文件
+                    if not downloaded:
+                        raise Exception(f"服务器返回了不完整的内容: {content_range or 'HTTP 206'}")
+                    print_warning("服务器返回的续传范围不匹配，重新下载")
+                    return self.download_file(url, save_path, False, progress=progress, expected_sha256=expected_sha256)
+                else:
+                    if downloaded:
+                        print_warning("服务器未接受续传请求（或远端文件已变化），重新下载")
+                    downloaded = 0
+                    mode = 'wb'
+                    total_size = int(response.headers.get('content-length', 0))
+                self._save_resume_validator(resume_file, response)
+                block_size = 8192
+
+                # hashlib的中间状态无法持久化，续传时只需读取一次已下载部分
+                sha256_hash = hashlib.sha256()
+                if mode == 'ab':
+                    with open(save_path, 'rb') as f:
+                        for byte_block in iter(lambda: f.read(MEMORY.buffer(HASH_BUFFER_SIZE)), b""):
+                            sha256_hash.update(byte_block)
+                
+                # 使用 tqdm 包装响应内容的迭代器
+                with open(save_path, mode) as f:
+                    if progress is not None:
+                        progress.add_total(total_size, initial=downloaded)
+                        for data in response.iter_content(block_size):
+                            f.write(data)
+                            sha256_hash.update(data)
+                            progress.update(len(data))
+                    else:
+                        # tqdm 的 total 参数设置为文件总大小，单位为字节
+                        with tqdm(total=total_size, initial=downloaded, unit='B', unit_scale=True, desc="下载中") as pbar:
+                            for data in response.iter_content(block_size): 
+                                f.write(data)
+                                sha256_hash.update(data)
+                                pbar.update(len(data))  # 更新进度条
+
+            # 校验最终大小，不完整时保留文件以便下次续传
+            if total_size and os.path.getsize(save_path) != total_size:
+                print_error(f"下载不完整: {os.path.getsize(save_path)}/{total_size} 字节")
+                return False
+            self._remove_file(resume_file)
+            return self._verify_download(save_path, sha256_hash.hexdigest(), expected_sha256)
         except Exception as e:
             print_error(f"下载失败: {str(e)}")
             return False
 
-    def extract_zip(self, zip_path, target_dir, is_dict=False) -> bool:
+    def _remember_digest(self, temp, target) -> None:
+        """将下载时计算的SHA256登记到摘要缓存（temp已重命名为target）"""
+        digest = self.download_digests.pop(temp, None)
+        if digest:
+            self.digest_cache.put(target, digest)
+
+    def _verify_download(self, save_path, digest, expected_sha256) -> bool:
+        """记录下载文件的SHA256并与期望值比对，不一致时删除文件"""
+        self.download_digests[save_path] = digest
+        if expected_sha256 and digest != expected_sha256:
+            print_error("文件校验失败（SHA256不一致），已删除下载文件")
+            self._remove_file(save_path)
+            self.download_digests.pop(save_path, None)
+            return False
+        return True
+
+    def _load_resume_validator(self, resume_file) -> Optional[str]:
+        """读取续传校验值（用于If-Range）"""
+        try:
+            with open(resume_file, 'r') as f:
+                return json.load(f).get("validator") or None
+        except Exception:
+            return None
+
+    def _save_resume_validator(self, resume_file, response) -> None:
+        """保存响应的校验值，If-Range只接受强ETag，否则使用Last-Modified"""
+        etag = response.headers.get('ETag', '')
+        validator = etag if etag and not etag.startswith('W/') else response.headers.get('Last-Modified', '')
+        if validator:
+            with open(resume_file, 'w') as f:
+                json.dump({"validator": validator}, f)
+        else:
+            self._remove_file(resume_file)
+
+    @staticmethod
+    def _remove_file(path) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+
+    def download_file_segmented(self, url, save_path, connections, progress=None, expected_sha256=None) -> bool:
         """
-        智能解压系统(支持排除文件)
+        多连接分段下载：按字节范围分块并发下载，写入预分配文件的对应偏移处
+        已完成的分块记录在 save_path.segments.json 中，断点续传时只下载未完成的分块；
+        服务器不支持范围请求（未返回206）时回退为单连接下载。
+        分块乱序到达，SHA256在全部分块完成后计算一次
         Args:
-            zip_path (str): 压缩文件路径
-            target_dir (str): 解压目标路径
-            is_dict (bool): 是否为词库文件(决定解压方式)
+            url (str): 下载链接
+            save_path (str): 保存路径
+            connections (int): 并发连接数
+            progress (DownloadProgress): 共享的汇总进度条（并发下载时传入）
+            expected_sha256 (str): 期望的SHA256，不一致时删除文件并返回失败
         """
-        def get_common_base_dir(members):
-            if not members:
-                return ""
+        state_file = save_path + ".segments.json"
+        try:
+            # 探测是否支持范围请求并获取文件总大小
+            with self.http.get(url, headers={'Range': 'bytes=0-0'}, stream=True) as probe:
+                content_range = probe.headers.get('Content-Range', '')
+                match = re.match(r'bytes\s+0-0/(\d+)', content_range)
+                total_size = int(match.group(1)) if match else 0
+                # 跟随重定向后的实际地址，避免每个分块重复跳转
+                final_url = probe.url
+            if probe.status_code != 206 or total_size < 2 * SEGMENT_SIZE:
+                if probe.status_code != 206:
+                    print_warning("服务器不支持分段下载，使用单连接下载")
+                # 预分配的分段文件不能用于单连接续传
+                is_continue = os.path.exists(save_path) and not os.path.exists(state_file)
+                if os.path.exists(state_file):
+                    os.remove(state_file)
+                return self.download_file(url, save_path, is_continue, progress=progress, expected_sha256=expected_sha256)
+
+            # 读取分块进度，文件大小或分块规格变化时重新开始
+            done = set()
             try:
-                common_prefix = os.path.commonprefix(members)
-                if common_prefix:
-                    return os.path.dirname(common_prefix) + '/'
-                return ""
-            except:
-                return ""
+                with open(state_file, 'r') as f:
+                    state = json.load(f)
+                if (state.get("total_size") == total_size and state.get("segment_size") == SEGMENT_SIZE
+                        and os.path.getsize(save_path) == total_size):
+                    done = set(state.get("done", []))
+            except Exception:
+                pass
+            if not done:
+                # 预分配文件
+                with open(save_path, 'wb') as f:
+                    f.truncate(total_size)
+
+            segments = [
+                (index, start, min(start + SEGMENT_SIZE, total_size) - 1)
+                for index, start in enumerate(range(0, total_size, SEGMENT_SIZE))
+            ]
+            state_lock = threading.Lock()
+
+            def save_state():
+                with open(state_file, 'w') as f:
+                    json.dump({"total_size": total_size, "segment_size": SEGMENT_SIZE, "done": sorted(done)}, f)
+
+            def fetch_segment(segment):
+                index, start, end = segment
+                headers = {'Range': f'bytes={start}-{end}'}
+                with self.http.get(final_url, headers=headers, stream=True) as response:
+                    if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {start}-'):
+                        raise Exception(f"分块 {index} 请求失败: HTTP {response.status_code}")
+                    written = 0
+                    with open(save_path, 'r+b') as f:
+                        f.seek(start)
+                        for data in response.iter_content(65536):
+                            f.write(data)
+                            written += len(data)
+                            progress.update(len(data))
+                if written != end - start + 1:
+                    raise Exception(f"分块 {index} 数据不完整")
+                with state_lock:
+                    done.add(index)
+                    save_state()
 
+            own_progress = progress is None
+            if own_progress:
+                print_download_source('cnb.cool' in url)
+                progress = DownloadProgress(desc=f"分段下载中({connections}连接)")
+            try:
+                progress.add_total(total_size, initial=sum(end - start + 1 for index, start, end in segments if index in done))
+                save_state()
+                with ThreadPoolExecutor(max_workers=connections) as executor:
+                    # list() 触发结果收集，任一分块失败即抛出异常
+                    list(executor.map(fetch_segment, [seg for seg in segments if seg[0] not in done]))
+            finally:
+                if own_progress:
+                    progress.close()
+            os.remove(state_file)
+            return self._verify_download(save_path, calculate_sha256(save_path), expected_sha256)
+        except Exception as e:
+            print_error(f"分段下载失败: {str(e)}")
+            return False
+
+    def download_pending(self, progress=None) -> bool:
+        """下载prepare_download中确定的待下载文件（启用自动选源时先选择最快的下载源）"""
+        pending = self.pending
+        url, source = pending["url"], None
+        mirrors = pending["info"].get("mirrors")
+        if mirrors and self.config_manager.config.getboolean('Settings', 'auto_source', fallback=False):
+            source, url = self.source_selector.choose(mirrors)
+            print(f"{COLOR['OKBLUE']}[i] {self.component_name}将从 {source} 下载{COLOR['ENDC']}")
+
+        save_path = pending["save_path"]
+        size_before = os.path.getsize(save_path) if os.path.exists(save_path) else 0
+        start = time.time()
+        success = self._download_from(url, progress)
+        if success and source and "remote_zip" not in pending:
+            self.source_selector.record(source, os.path.getsize(save_path) - size_before, time.time() - start)
+        return success
+
+    def _download_from(self, url, progress=None) -> bool:
+        """从指定地址下载待下载文件（部分下载模式下只打开远程压缩包，安装时再读取变化的文件）"""
+        pending = self.pending
+        if pending.get("partial"):
+            try:
+                remote_zip = HttpRangeFile.open(self.http, url)
+            except requests.RequestException:
+                remote_zip = None
+            if remote_zip is not None:
+                pending["remote_zip"] = remote_zip
+                print(f"{COLOR['OKBLUE']}[i] {self.component_name}将只下载有变化的文件{COLOR['ENDC']}")
+                return True
+            print_warning(f"服务器不支持范围请求，{self.component_name}将下载完整压缩包")
+        return self.download_file(
+            url, pending["save_path"], pending["is_continue"],
+            progress=progress, expected_sha256=pending["info"].get("sha256")
+        )
+
+    def _prepare_temp_file(self, temp_file, pattern) -> bool:
+        """
+        准备临时下载文件
+        Args:
+            temp_file (str): 本次下载使用的临时文件
+            pattern (str): 旧临时文件的匹配模式（将被删除）
+        Returns:
+            bool: 是否断点续传
+        """
+        if os.path.exists(temp_file):
+            return True
+        # 同时移除旧临时文件的附属状态文件（如分段下载进度）
+        cache_files = os.listdir(self.custom_dir)
+        for old_should_drop in fnmatch.filter(cache_files, pattern) + fnmatch.filter(cache_files, pattern + ".*"):
+            os.remove(os.path.join(self.custom_dir, old_should_drop))
+        return False
+
+    def use_incremental_extract(self) -> bool:
+        """是否增量解压：已开启增量解压且存在上次安装的清单"""
+        return (self.config_manager.config.getboolean('Settings', 'incremental_extract', fallback=True)
+                and os.path.exists(self.manifest_file))
+
+    def use_partial_zip(self) -> bool:
+        """是否只下载变化的文件：已开启部分下载且可以增量解压"""
+        return (self.config_manager.config.getboolean('Settings', 'partial_zip', fallback=False)
+                and self.use_incremental_extract())
+
+    def keep_archives(self) -> bool:
+        """安装后是否保留下载的压缩包（默认只依赖安装清单）"""
+        return self.config_manager.config.getboolean('Settings', 'keep_archives', fallback=False)
+
+    def is_installed(self, remote_sha256, target_file, property_type, property_name) -> bool:
+        """远端文件是否与已安装的一致：有保存的压缩包时对比其SHA256，否则对比更新记录"""
+        if os.path.exists(target_file):
+            return self.file_compare(remote_sha256, target_file)
+        try:
+            with open(self.record_file, 'r') as f:
+                record = json.load(f)
+        except Exception:
+            return False
+        return record.get(property_type) == property_name and record.get("sha256") == remote_sha256
+
+    def remote_fingerprint(self, url) -> Dict:
+        """HEAD请求获取远端文件的大小与ETag，失败时返回空字典"""
+        try:
+            response = self.http.head(url)
+            response.raise_for_status()
+        except requests.RequestException:
+            return {}
+        fingerprint = {}
+        if response.headers.get('Content-Length'):
+            fingerprint["size"] = int(response.headers['Content-Length'])
+        if response.headers.get('ETag'):
+            fingerprint["etag"] = response.headers['ETag']
+        return fingerprint
+
+    def content_unchanged(self, remote_info, property_type, property_name) -> Tuple[bool, Dict]:
+        """
+        下载前确认远端内容是否与已安装的一致（发布时间或资源id变化、内容未变时无需下载）
+        先对比HEAD请求得到的ETag及大小，不一致时再通过范围请求读取压缩包的中央目录与安装清单对比
+        Returns:
+            tuple: (内容是否未变化, 远端文件指纹（安装后写入更新记录）)
+        """
+        if not self.config_manager.config.getboolean('Settings', 'remote_fingerprint', fallback=True):
+            return False, {}
+        fingerprint = self.remote_fingerprint(remote_info["url"])
+        try:
+            with open(self.record_file, 'r') as f:
+                record = json.load(f)
+        except Exception:
+            return False, fingerprint
+        if record.get(property_type) != property_name:
+            return False, fingerprint
+        if fingerprint.get("etag") and fingerprint == record.get("fingerprint"):
+            return True, fingerprint
+        return self._archive_matches_install(remote_info["url"]), fingerprint
+
+    def _archive_matches_install(self, url) -> bool:
+        """远端压缩包中央目录中的文件（大小、CRC）是否与安装清单完全一致，只需读取压缩包尾部"""
+        manifest = InstallManifest.load(self.manifest_file)
+        if not manifest.files:
+            return False
         try:
+            remote_zip = HttpRangeFile.open(self.http, url)
+            if remote_zip is None:
+                return False
+            # 只在此处使用一次，不放入共享的索引缓存
+            index = ZipIndex(remote_zip)
+            try:
+                members, _ = self.archive_members(index)
+            finally:
+                index.zip.close()
+        except Exception:
+            return False
+        return {key: (member.size, member.crc) for key, member in members} == manifest.entries()
+
+    def _store_archive(self, temp_file, target_file, remote_zip=None) -> None:
+        """安装完成后处理下载的压缩包：开启keep_archives时保存为target_file，否则删除"""
+        # 移除已过期的旧压缩包
+        if os.path.exists(target_file):
+            os.remove(target_file)
+        if remote_zip is not None:
+            # 部分下载时本地没有新版压缩包
+            self._report_partial(remote_zip)
+        elif self.keep_archives():
+            os.rename(temp_file, target_file)
+            self._remember_digest(temp_file, target_file)
+        else:
+            os.remove(temp_file)
+            self.download_digests.pop(temp_file, None)
+
+    def extract_worker_count(self) -> int:
+        """并行解压线程数：0为自动（iOS等低核设备逐个解压），低内存模式下受内存预算限制"""
+        workers = self.config_manager.config.getint('Settings', 'extract_workers', fallback=0)
+        if workers <= 0:
+            workers = 1 if SYSTEM_TYPE == 'ios' else min(EXTRACT_MAX_WORKERS, os.cpu_count() or 1)
+        return MEMORY.workers(workers)
+
+    def _report_partial(self, remote_zip) -> None:
+        """输出部分下载实际传输的数据量"""
+        print(f"{COLOR['OKBLUE']}[i] 实际下载 {remote_zip.bytes_fetched / 1024:.1f} KB"
+              f"（完整压缩包 {remote_zip.size / 1024 / 1024:.2f} MB）{COLOR['ENDC']}")
+
+    def archive_members(self, index: ZipIndex) -> Tuple[List[Tuple[str, ZipMember]], List[str]]:
+        """
+        筛选压缩包成员并去除公共根目录
+        Args:
+            index (ZipIndex): 压缩包索引
+        Returns:
+            tuple: ([(清单键, ZipMember)], 被排除的成员名)
+        """
+        # 公共根目录只计算一次；排除规则按去除根目录后的清单键匹配，与清理、校验保持一致
+        names = [member.name for member in index.members]
+        common_prefix = os.path.commonprefix(names) if names else ""
+        base_dir = os.path.dirname(common_prefix) + '/' if common_prefix else ""
+        members, excluded = [], []
+        for member in index.members:
+            name = member.name
+            relative_path = name[len(base_dir):] if base_dir and name.startswith(base_dir) else name
+            key = os.path.normpath(relative_path.replace('/', os.sep)).replace(os.sep, '/')
+            if self.exclude_matcher.match(key):
+                excluded.append(name)
+            else:
+                members.append((key, member))
+        return members, excluded
+
+    def plan_extraction(self, index, target_dir) -> Tuple[List[Tuple[ZipMember, str, str]], List[str]]:
+        """
+        一次遍历生成解压计划：判断排除、去除公共根目录并计算目标路径
+        Args:
+            index (ZipIndex): 压缩包索引
+            target_dir (str): 解压目标路径
+        Returns:
+            tuple: (解压计划[(ZipMember, 清单键, 目标路径)], 需要创建的目录)
+        """
+        members, excluded = self.archive_members(index)
+        for name in excluded:
+            print_warning(f"跳过排除文件: {os.path.normpath(name.replace('/', os.sep))}")
+
+        plan = []
+        dirs = set()
+        for manifest_key, member in members:
+            target_path = os.path.join(target_dir, os.path.normpath(manifest_key))
+            plan.append((member, manifest_key, target_path))
+            dirs.add(os.path.dirname(target_path))
+        return plan, sorted(dirs)
+
+    @staticmethod
+    def _extract_parallel(zip_path, to_write, workers, pbar) -> None:
+        """
+        多线程解压：每个线程使用独立的ZipFile句柄，按文件大小均衡分配（最大者优先分给负载最小的线程）
+        任一文件失败时其余线程停止并抛出异常
+        Args:
+            zip_path (str): 压缩文件路径
+            to_write (list): 需要写入的文件[(ZipMember, 写入路径)]
+            workers (int): 线程数
+            pbar (tqdm): 解压进度条
+        """
+        workers = min(workers, len(to_write))
+        shares = [[] for _ in range(workers)]
+        loads = [(0, index) for index in range(workers)]
+        for item in sorted(to_write, key=lambda item: item[0].size, reverse=True):
+            load, index = heapq.heappop(loads)
+            shares[index].append(item)
+            heapq.heappush(loads, (load + item[0].size, index))
+
+        failed = threading.Event()
+        pbar_lock = threading.Lock()
+
+        def extract_share(share):
+            # ZipFile句柄不能跨线程共享读取位置，成员信息沿用索引中已解析的
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                exclude_patterns = self.exclude_files  # 获取排除模式
-                
-                members = []
-                info_map = {}  # 解码后名字 → ZipInfo 映射
-    
-                for info in zip_ref.infolist():
-                    try:
-                        decoded_name = info.filename.encode('cp437').decode('utf-8')
-                    except:
-                        decoded_name = info.filename
-    
-                    if info.is_dir():
-                        continue
-    
-                    members.append(decoded_name)
-                    info_map[decoded_name] = info
-    
-                # 计算实际需要解压的文件数量
-                valid_members = []
-                for member in members:
-                    # 标准化路径格式
-                    normalized_path = os.path.normpath(member.replace('/', os.sep))
-                    file_name = os.path.basename(normalized_path)
-                    # 检查排除规则
-                    exclude = any(
-                        fnmatch.fnmatch(normalized_path, pattern) or 
-                        fnmatch.fnmatch(file_name, pattern)
-                        for pattern in exclude_patterns
-                    )
-                    if not exclude:
-                        valid_members.append(member)
-                    else:
-                        print_warning(f"跳过排除文件: {normalized_path}")
-    
-                # 使用有效文件数量作为进度条的总数
-                with tqdm(total=len(valid_members), desc="解压中") as pbar:
-                    for member in valid_members:
-                        # 计算相对路径
-                        if is_dict:
-                            base_dir = get_common_base_dir(valid_members)
-                            if base_dir and member.startswith(base_dir):
-                                relative_path = member[len(base_dir):]
-                            else:
-                                relative_path = member
-                        else:
-                            base_dir = get_common_base_dir(valid_members)
-                            if base_dir and member.startswith(base_dir):
-                                relative_path = member[len(base_dir):]
-                            else:
-                                relative_path = member
-    
-                        # 标准化路径
-                        normalized_path = os.path.normpath(relative_path.replace('/', os.sep))
-                        target_path = os.path.join(target_dir, normalized_path)
-                        os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                        info = info_map[member]
-                        with zip_ref.open(info) as src, open(target_path, 'wb') as dst:
-                            dst.write(src.read())
+                for member, path in share:
+                    if failed.is_set():
+                        return
+                    with zip_ref.open(member.info) as src, open(path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, MEMORY.buffer(EXTRACT_BUFFER_SIZE))
+                    with pbar_lock:
+                        pbar.update(1)
+
+        def run_share(share):
+            try:
+                extract_share(share)
+            except Exception:
+                failed.set()
+                raise
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() 触发结果收集，任一线程失败即抛出异常
+            list(executor.map(run_share, shares))
+
+    def stage_zip(self, zip_path, target_dir, manifest=None, incremental=False, restore=None, claimed=frozenset()) -> Optional[StagedInstall]:
+        """
+        将需要写入的文件解压到暂存目录并校验（此时输入法仍在运行）
+        Args:
+            zip_path (str|HttpRangeFile): 压缩文件路径（或远程压缩包文件对象）
+            target_dir (str): 解压目标路径
+            manifest (InstallManifest): 安装清单，提交后更新为本次安装的文件
+            incremental (bool): 增量解压：跳过CRC及大小与清单一致且未被改动的文件
+            清单中已不在新压缩包内的文件在提交时删除
+            restore (set): 修复时只重新写入这些清单键，其余文件沿用清单记录且不清理旧文件
+            claimed (set): 同一更新会话中先提交的组件将写入或删除的文件（规范化路径），
+                           这些文件即使与清单一致也重新写入，且不作为旧文件删除
+        Returns:
+            StagedInstall: 暂存结果，失败时返回None（暂存目录已清理）
+        """
+        staged = StagedInstall(target_dir, os.path.join(self.custom_dir, self.staging_name), manifest)
+        staged.discard()  # 清理上次中断残留的暂存文件
+        try:
+            index = ZipIndex.open(zip_path)
+            plan, staged.dirs = self.plan_extraction(index, target_dir)
+            diff = None
+            if manifest is not None and manifest.files:
+                # 与上次安装的清单对比：确定未变化的文件及需要清理的旧文件
+                diff = ManifestDiff.compare(
+                    manifest.entries(),
+                    {manifest_key: (member.size, member.crc) for member, manifest_key, _ in plan}
+                )
+            to_write = []
+            for member, manifest_key, target_path in plan:
+                if restore is not None and manifest_key not in restore:
+                    if manifest is not None and manifest_key in manifest.files:
+                        staged.installed[manifest_key] = manifest.files[manifest_key]
+                    staged.skipped += 1
+                elif (incremental and diff is not None and manifest_key in diff.unchanged
+                        and _path_key(target_path) not in claimed
+                        and manifest.is_unchanged(manifest_key, target_path, member.size, member.crc)):
+                    # 内容未变化：不重写，保留原修改时间
+                    staged.installed[manifest_key] = manifest.files[manifest_key]
+                    staged.skipped += 1
+                else:
+                    to_write.append((member, staged.staged_path(manifest_key)))
+                    staged.written.append((manifest_key, staged.staged_path(manifest_key), target_path, member.size, member.crc))
+            for directory in {os.path.dirname(path) for _, path in to_write}:
+                os.makedirs(directory, exist_ok=True)
+
+            # 使用有效文件数量作为进度条的总数
+            with tqdm(total=len(plan), initial=staged.skipped, desc="解压中") as pbar:
+                workers = self.extract_worker_count()
+                # 远程压缩包无法为每个线程单独打开，数据量小时并行收益不足
+                if (workers > 1 and isinstance(zip_path, str) and len(to_write) > 1
+                        and sum(member.compress_size for member, _ in to_write) >= EXTRACT_PARALLEL_MIN_SIZE):
+                    self._extract_parallel(zip_path, to_write, workers, pbar)
+                else:
+                    for member, path in to_write:
+                        # 分块写入，避免大文件整体读入内存（读取结束时zipfile会校验CRC）
+                        with index.zip.open(member.info) as src, open(path, 'wb') as dst:
+                            shutil.copyfileobj(src, dst, MEMORY.buffer(EXTRACT_BUFFER_SIZE))
                         pbar.update(1)  # 更新进度条
-    
-            return True
+
+            for manifest_key, staged_path, _, size, _ in staged.written:
+                if os.path.getsize(staged_path) != size:
+                    raise Exception(f"文件大小校验失败: {manifest_key}")
+            if diff is not None and restore is None:
+                # 上个版本安装、但已不在新压缩包中的文件及清理后为空的目录（排除文件除外）
+                staged.stale, staged.old_dirs = diff.cleanup_paths(target_dir, self.exclude_matcher.match)
+                staged.stale = [path for path in staged.stale if _path_key(path) not in claimed]
+            if incremental and diff is not None:
+                print_success(f"增量解压：写入 {len(staged.written)} 个文件，跳过 {staged.skipped} 个未变化文件")
+            return staged
         except zipfile.BadZipFile:
             print_error("ZIP文件损坏")
-            return False
         except Exception as e:
             print_error(f"解压失败: {str(e)}")
+        staged.discard()
+        return None
+
+    def install_dir(self) -> str:
+        """解压安装的目标目录"""
+        return self.extract_path
+
+    def verify_install(self) -> Optional[Dict]:
+        """
+        校验安装目录中的文件是否与安装清单一致
+        先对比大小与修改时间，只对大小相同但修改时间变化的文件并行计算CRC
+        Returns:
+            dict: {"modified", "missing", "extra": 相对路径列表, "crc_checked": 计算CRC的文件数}，没有安装清单时返回None
+        """
+        manifest = InstallManifest.load(self.manifest_file)
+        if not manifest.files:
+            print_warning(f"没有{self.component_name}安装清单，请先完成一次更新")
+            return None
+        root = self.install_dir()
+        files = {key: entry for key, entry in manifest.files.items() if self.owns_key(key)}
+        existing, _ = scan_tree(root, files)
+        modified, missing, suspects = [], [], []
+        for key, entry in files.items():
+            if key not in existing:
+                missing.append(key)
+                continue
+            try:
+                stat = os.stat(os.path.join(root, os.path.normpath(key)))
+            except OSError:
+                missing.append(key)
+                continue
+            if stat.st_size != entry.get("size"):
+                modified.append(key)
+            elif stat.st_mtime_ns != entry.get("mtime_ns"):
+                suspects.append((key, stat.st_mtime_ns))
+
+        if suspects:
+            with ThreadPoolExecutor(max_workers=self.extract_worker_count()) as executor:
+                crcs = list(executor.map(
+                    lambda item: calculate_crc32(os.path.join(root, os.path.normpath(item[0]))), suspects
+                ))
+            touched = False
+            for (key, mtime_ns), crc in zip(suspects, crcs):
+                if crc == manifest.files[key].get("crc"):
+                    # 内容未变化：记录新的修改时间，下次校验无需再计算CRC
+                    manifest.files[key]["mtime_ns"] = mtime_ns
+                    touched = True
+                else:
+                    modified.append(key)
+            if touched:
+                manifest.save()
+
+        # 安装目录中不属于清单的文件（排除文件除外）；方案与用户文件共用根目录，只报告子目录中的多余文件
+        extra = [
+            key for key in existing - manifest.files.keys() - self.foreign_keys()
+            if (self.owns_install_dir or '/' in key) and self.owns_key(key) and not self.exclude_matcher.match(key)
+        ]
+        report = {
+            "modified": sorted(modified),
+            "missing": sorted(missing),
+            "extra": sorted(extra),
+            "crc_checked": len(suspects)
+        }
+        self._print_verify_report(report, len(files))
+        return report
+
+    def _print_verify_report(self, report, total) -> None:
+        """输出校验结果（每类最多列出10个文件）"""
+        print(f"{COLOR['OKBLUE']}[i] {self.component_name}：已校验 {total} 个文件，其中 {report['crc_checked']} 个计算了CRC{COLOR['ENDC']}")
+        if not (report["modified"] or report["missing"] or report["extra"]):
+            print_success(f"{self.component_name}文件与安装清单一致")
+            return
+        for label, key in (("被修改", "modified"), ("缺失", "missing"), ("多余", "extra")):
+            if report[key]:
+                print_warning(f"{label}的文件 {len(report[key])} 个：")
+                for path in report[key][:10]:
+                    print(f"{INDENT}{path}")
+                if len(report[key]) > 10:
+                    print(f"{INDENT}...")
+
+    def repair_install(self, report) -> bool:
+        """
+        从缓存的压缩包（未保留时通过范围请求读取同一版本的远程压缩包）只恢复被修改或缺失的文件
+        Args:
+            report (dict): verify_install的校验结果
+        """
+        drifted = set(report["modified"]) | set(report["missing"])
+        if not drifted:
+            return True
+        manifest = InstallManifest.load(self.manifest_file)
+        source = self._repair_source()
+        if source is None:
+            print_error(f"没有可用于修复的{self.component_name}压缩包，请重新下载更新")
+            return False
+        try:
+            try:
+                members, _ = self.archive_members(ZipIndex.open(source))
+            except Exception as e:
+                print_error(f"读取压缩包失败: {str(e)}")
+                return False
+            archive = {key: (member.size, member.crc) for key, member in members if self.owns_key(key)}
+            installed = {key: entry for key, entry in manifest.entries().items() if self.owns_key(key)}
+            if archive != installed:
+                print_error(f"压缩包与已安装的{self.component_name}版本不一致，请重新下载更新")
+                return False
+
+            # 只重新写入被修改或缺失的文件（复用上面解析的索引）
+            staged = self.stage_zip(source, self.install_dir(), manifest=manifest, restore=drifted)
+        finally:
+            ZipIndex.close_all()
+        if staged is None:
             return False
+        start = time.perf_counter()
+        try:
+            if hasattr(self, 'terminate_processes'):
+                self.terminate_processes()
+            staged.commit()
+        except Exception as e:
+            print_error(f"修复失败: {str(e)}")
+            staged.rollback()
+            staged.discard()
+            return False
+        staged.finalize()
+        print(f"{COLOR['OKBLUE']}[i] 提交修复耗时 {time.perf_counter() - start:.2f} 秒{COLOR['ENDC']}")
+        if isinstance(source, HttpRangeFile):
+            self._report_partial(source)
+        print_success(f"已修复 {len(staged.written)} 个{self.component_name}文件")
+        MEMORY.report()
+        return True
+
+    def _repair_source(self):
+        """修复使用的压缩包：优先使用UpdateCache中保留的压缩包，其次为同一版本的远程压缩包"""
+        target_file = self.installed_archive()
+        if os.path.isfile(target_file):
+            return target_file
+        try:
+            with open(self.record_file, 'r') as f:
+                record = json.load(f)
+        except Exception:
+            return None
+        info = self.update_info
+        if not info:
+            return None
+        if info.get("sha256") and record.get("sha256"):
+            same_version = info["sha256"] == record["sha256"]
+        else:
+            # cnb资源没有摘要：以资源id及更新时间确认远端仍是已安装的版本
+            same_version = (bool(info.get("id")) and info["id"] == record.get("cnb_id")
+                            and info.get("update_time") == record.get("update_time"))
+        if not same_version:
+            return None
+        try:
+            return HttpRangeFile.open(self.http, info["url"])
+        except requests.RequestException:
+            return None
+
+    def installed_archive(self) -> str:
+        """UpdateCache中保留的已安装版本的压缩包路径"""
+        raise NotImplementedError
+
+    def owns_key(self, key) -> bool:
+        """安装清单中的文件是否由本组件维护（校验与修复只针对这些文件）"""
+        return True
+
+    def foreign_keys(self) -> Set[str]:
+        """安装目录中由其他组件安装的文件（相对安装目录的清单键），校验时不作为多余文件报告"""
+        return set()
+
+    def install_update(self) -> int:
+        """
+        安装已下载的更新（单独安装时同样经由更新会话）
+        return:
+            -1: 更新失败
+            1: 更新成功
+        """
+        return UpdateSession().install([self])[self]
+
+    def stage_install(self, claimed=frozenset()):
+        """
+        在输入法运行期间准备安装，返回可提交/回滚的暂存结果（StagedInstall或StagedFile）
+        Args:
+            claimed (set): 同一更新会话中先提交的组件将写入或删除的文件（规范化路径）
+        """
+        raise NotImplementedError
+
+    def finish_install(self) -> None:
+        """全部组件提交成功后保存压缩包与更新记录"""
+        raise NotImplementedError
+
+    def abort_install(self) -> None:
+        """暂存失败时的清理"""
+        pass
 
 
     if SYSTEM_TYPE == 'windows':
@@ -1072,28 +2630,36 @@ class UpdateHandler:
                 time.sleep(0.5)
             print_success("进程清理完成")
 
-        def deploy_weasel(self):
-            """智能部署引擎"""
+        def start_service(self):
+            """启动小狼毫服务（带重试）"""
+            for retry in range(3):
+                try:
+                    print_subheader("启动小狼毫服务")
+                    subprocess.Popen(
+                        [self.weasel_server],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                        creationflags=subprocess.CREATE_NO_WINDOW
+                    )
+                    time.sleep(2)
+                    break
+                except Exception as e:
+                    if retry == 2:
+                        raise
+                    print_warning(f"服务启动失败，重试({retry+1}/3)...")
+                    time.sleep(1)
+
+        def deploy_weasel(self, stop_service=True):
+            """
+            智能部署引擎
+            Args:
+                stop_service (bool): 是否先停止服务（更新会话已停止服务时无需重复停止）
+            """
             try:
-                self.terminate_processes()
+                if stop_service:
+                    self.terminate_processes()
                 
-                # 服务启动重试机制
-                for retry in range(3):
-                    try:
-                        print_subheader("启动小狼毫服务")
-                        subprocess.Popen(
-                            [self.weasel_server],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                            creationflags=subprocess.CREATE_NO_WINDOW
-                        )
-                        time.sleep(2)
-                        break
-                    except Exception as e:
-                        if retry == 2:
-                            raise
-                        print_warning(f"服务启动失败，重试({retry+1}/3)...")
-                        time.sleep(1)
+                self.start_service()
                 
                 # 部署执行与验证
                 print_subheader("执行部署操作")
@@ -1118,8 +2684,8 @@ class UpdateHandler:
                 return False
     
     if SYSTEM_TYPE == 'macos':
-        def deploy_for_mac(self) -> bool:
-            """macOS自动部署"""
+        def deploy_for_mac(self, wait=True) -> bool:
+            """macOS自动部署（wait为False时不等待用户查看通知）"""
             if self.engine == '鼠须管':
                 executable = r"/Library/Input Methods/Squirrel.app/Contents/MacOS/Squirrel"
                 cmd = ["--reload"]
@@ -1128,8 +2694,9 @@ class UpdateHandler:
                 cmd = ["/config/addon/rime/deploy", "-X", "POST", "-d", "{}"]
 
             if os.path.exists(executable):
-                print_warning("即将进行自动部署，请查看通知中心确认部署")
-                time.sleep(2)
+                if wait:
+                    print_warning("即将进行自动部署，请查看通知中心确认部署")
+                    time.sleep(2)
                 try:
                     subprocess.run([executable] + cmd, check=True, capture_output=True, text=True)
                     print_success("已执行自动部署")
@@ -1156,12 +2723,18 @@ class CombinedUpdater:
         self.shared_releases = None
         # 文件名重试计数器
         self.filename_retry_count: int = 0
-    def fetch_all_updates(self) -> None:
-        """获取所有更新信息"""
+    def release_url(self, use_mirror=None) -> Tuple[str, bool]:
+        """方案及词库发布信息的URL，以及是否使用cnb镜像（默认按配置）"""
         url = f"https://api.github.com/repos/{OWNER}/{REPO}/releases"
-        use_mirror = self.config_manager.config.getboolean('Settings', 'use_mirror', fallback=False)
+        if use_mirror is None:
+            use_mirror = self.config_manager.config.getboolean('Settings', 'use_mirror', fallback=False)
         if use_mirror:
             url = f"https://cnb.cool/{OWNER}/{CNB_REPO}/-/releases"
+        return url, use_mirror
+
+    def fetch_all_updates(self) -> None:
+        """获取所有更新信息"""
+        url, use_mirror = self.release_url()
         self.shared_releases = self.scheme_updater.remote_api_request(
             url = url,
             use_mirror = use_mirror
@@ -1176,6 +2749,28 @@ class CombinedUpdater:
         self.model_updater.update_info = self.model_updater.check_update()
         # 脚本更新独立检查
         self.script_updater.update_info = self.script_updater.check_update()
+        # 自动选源时补充另一下载源的地址
+        if self.config_manager.config.getboolean('Settings', 'auto_source', fallback=False):
+            self.attach_mirrors()
+
+    def attach_mirrors(self) -> None:
+        """为方案、词库及模型的更新信息补充另一下载源（cnb/GitHub）的同一文件地址"""
+        url, use_mirror = self.release_url()
+        alternate_url, _ = self.release_url(not use_mirror)
+        alternate_releases = self.scheme_updater.remote_api_request(
+            url = alternate_url,
+            use_mirror = not use_mirror
+        )
+        pairs = [
+            (self.scheme_updater.update_info, self._extract_scheme_update(alternate_releases)),
+            (self.dict_updater.update_info, self._extract_dict_update(alternate_releases)),
+            (self.model_updater.update_info, self.model_updater.check_update(use_mirror=not use_mirror)),
+        ]
+        primary, alternate = ("cnb", "github") if use_mirror else ("github", "cnb")
+        for info, alternate_info in pairs:
+            # 两个源的文件大小一致时才视为同一文件，避免同步延迟导致下载到不同版本
+            if info and alternate_info and info.get("size") and info.get("size") == alternate_info.get("size"):
+                info["mirrors"] = {primary: info["url"], alternate: alternate_info["url"]}
 
     def refresh_filenames(self) -> None:
         """自动更新文件名并刷新配置"""
@@ -1220,12 +2815,13 @@ class CombinedUpdater:
                 return key
         return list(SCHEME_MAP.values())[0]
 
-    def _extract_scheme_update(self) -> Optional[Dict]:
-        """从仓库数据中提取方案更新"""
-        if not self.shared_releases:
+    def _extract_scheme_update(self, releases=None) -> Optional[Dict]:
+        """从仓库数据中提取方案更新（默认使用共享的releases数据）"""
+        releases = self.shared_releases if releases is None else releases
+        if not releases:
             return None
             
-        for release in self.shared_releases:
+        for release in releases:
             for asset in release.get("assets", []):
                 if asset["name"] == self.scheme_updater.scheme_file:
                     update_description = release.get("body", "无更新说明")
@@ -1234,35 +2830,124 @@ class CombinedUpdater:
                         "update_time": asset.get("updated_at"),
                         "tag": release.get("tag_name") or release.get("tag_ref").split('/')[-1], # 前面是GitHub上tag内容，后面是cnb上tag内容，两者都是版本信息
                         "description": update_description,
+                        "size": asset.get("size") or asset.get("sizeInByte"),
                         "sha256": asset.get("digest").split(':')[-1] if asset.get("digest","") else "", # 仅GitHub
                         "id": asset.get("id", "")                                               # 仅cnb
                     }
         return None
     
-    def _extract_dict_update(self) -> Optional[Dict]:
-        """从仓库数据中提取词库更新"""
-        if not self.shared_releases:
+    def _extract_dict_update(self, releases=None) -> Optional[Dict]:
+        """从仓库数据中提取词库更新（默认使用共享的releases数据）"""
+        releases = self.shared_releases if releases is None else releases
+        if not releases:
             return None
             
-        for release in self.shared_releases:
+        for release in releases:
             for asset in release.get("assets", []):
                 if asset["name"] == self.dict_updater.dict_file:
                     return {
                         "url": asset.get("browser_download_url") or "https://cnb.cool" + asset.get("path"),
                         "update_time": asset.get("updated_at"),
                         "tag": release.get("tag_name") or release.get("tag_ref").split('/')[-1], # 前面是GitHub上tag内容，后面是cnb上tag内容，两者都是版本信息,
+                        "size": asset.get("size") or asset.get("sizeInByte"),
                         "sha256": asset.get("digest").split(':')[-1] if asset.get("digest","") else "", # 仅GitHub
                         "id": asset.get("id", "")                                               # 仅cnb
                     }
         return None
 
 
+# ====================== 并发检查引擎 ======================
+class UpdateCheckEngine:
+    """异步更新检查引擎：同时请求所有发布信息，再汇总为一份更新计划"""
+    def __init__(self, combined_updater, timeout=CHECK_TIMEOUT):
+        """
+        Args:
+            combined_updater (CombinedUpdater): 组合更新器
+            timeout (int): 每次请求尝试的超时（秒），传输层的退避重试仍然生效
+        """
+        self.combined_updater = combined_updater
+        self.timeout = timeout
+
+    def _release_requests(self) -> List[Tuple[UpdateHandler, str, bool]]:
+        """需要请求的发布信息（更新器, URL, 是否使用cnb镜像），相同URL只请求一次"""
+        combined = self.combined_updater
+        candidates = [
+            (combined.scheme_updater,) + combined.release_url(),
+            (combined.model_updater,) + combined.model_updater.release_url(),
+            (combined.script_updater,) + combined.script_updater.release_url(),
+        ]
+        # 自动选源时同时获取另一下载源的发布信息
+        if combined.config_manager.config.getboolean('Settings', 'auto_source', fallback=False):
+            use_mirror = combined.release_url()[1]
+            candidates += [
+                (combined.scheme_updater,) + combined.release_url(not use_mirror),
+                (combined.model_updater,) + combined.model_updater.release_url(not use_mirror),
+            ]
+        requests_list, seen = [], set()
+        for updater, url, use_mirror in candidates:
+            if url not in seen:
+                seen.add(url)
+                requests_list.append((updater, url, use_mirror))
+        return requests_list
+
+    async def _fetch(self, updater, url, use_mirror) -> None:
+        """
+        在线程中发起请求，结果写入共享的发布信息目录
+        超时直接交给请求本身（线程无法被取消），失败的URL记入目录，本轮汇总时不再重复请求
+        """
+        data = await asyncio.to_thread(updater.remote_api_request, url, use_mirror, timeout=self.timeout)
+        if data is None:
+            self.combined_updater.config_manager.release_catalog.mark_failed(url)
+
+    async def _fetch_all(self) -> None:
+        release_requests = self._release_requests()
+        # 低内存模式下按内存预算限制同时进行的请求数
+        limit = asyncio.Semaphore(MEMORY.workers(len(release_requests)))
+
+        async def fetch(request):
+            async with limit:
+                await self._fetch(*request)
+
+        await asyncio.gather(*(fetch(request) for request in release_requests))
+
+    def run(self) -> Dict[str, Dict]:
+        """
+        并发获取所有发布信息并生成更新计划
+        Returns:
+            dict: 组件名 → {"info": 更新信息, "has_update": 是否需要更新}
+        """
+        combined = self.combined_updater
+        catalog = combined.config_manager.release_catalog
+        # 失败记录只在本轮检查内有效，之后的查询（如FileChecker）及下次检查会重新请求
+        catalog.clear_failures()
+        try:
+            asyncio.run(self._fetch_all())
+            # 发布信息均已在目录中，以下检查不再产生网络请求（文件名变更时除外）
+            combined.fetch_all_updates()
+        finally:
+            catalog.clear_failures()
+        plan = {}
+        for name, updater in (
+            ("scheme", combined.scheme_updater),
+            ("dict", combined.dict_updater),
+            ("model", combined.model_updater),
+        ):
+            plan[name] = {"info": updater.update_info, "has_update": bool(updater.update_info) and updater.has_update()}
+        plan["script"] = {"info": combined.script_updater.update_info, "has_update": bool(combined.script_updater.update_info)}
+        return plan
+
+
 # ====================== 方案更新 ======================
 class SchemeUpdater(UpdateHandler):
     """方案更新处理器"""
+    component_name = "方案"
+    update_title = "方案更新流程"
+    staging_name = "scheme_staging"
+
     def __init__(self, config_manager):
         super().__init__(config_manager)
         self.record_file = os.path.join(self.custom_dir, "scheme_record.json")
+        self.manifest_file = os.path.join(self.custom_dir, "scheme_manifest.json")
         
 
     def run(self) -> int:
@@ -1272,7 +2957,21 @@ class SchemeUpdater(UpdateHandler):
             0: 已经是最新/无可用更新
             1: 更新成功
         """
-        print_header("方案更新流程")
+        print_header(self.update_title)
+        status = self.prepare_download()
+        if status is not None:
+            return status
+        if not self.download_pending():
+            return -1
+        return self.install_update()
+
+    def prepare_download(self) -> Optional[int]:
+        """
+        检查是否需要下载，需要时生成待下载信息
+        return:
+            None: 需要下载（信息保存在self.pending中）
+            0: 已经是最新/无可用更新
+        """
         # 使用缓存信息而不是重复API调用
         remote_info = self.update_info
         
@@ -1292,37 +2991,77 @@ class SchemeUpdater(UpdateHandler):
         target_file = os.path.join(self.custom_dir, self.scheme_file)
         # 校验本地文件和远端文件sha256
         if remote_info['sha256']:
-            if os.path.exists(target_file) and self.file_compare(remote_info['sha256'], target_file):
+            if self.is_installed(remote_info['sha256'], target_file, "scheme_file", self.scheme_file):
                 print_success("文件内容未变化，将更新本地保存的记录")
                 self.save_record(self.record_file, "scheme_file", self.scheme_file, remote_info)
                 return 0
+        # 对比远端文件指纹，仅发布时间变化时不下载
+        unchanged, fingerprint = self.content_unchanged(remote_info, "scheme_file", self.scheme_file)
+        if unchanged:
+            print_success("远端方案内容未变化，将更新本地保存的记录")
+            self.save_record(self.record_file, "scheme_file", self.scheme_file, remote_info, fingerprint)
+            return 0
         
         # 下载更新
         _suffix = remote_info['sha256'] or remote_info['id']
         temp_file = os.path.join(self.custom_dir, f"temp_scheme_{_suffix}.zip")
-        if os.path.exists(temp_file):
-            is_continue = True
-        else:
-            is_continue = False
-            for old_should_drop in fnmatch.filter(os.listdir(self.custom_dir), "temp_scheme*.zip"):
-                os.remove(os.path.join(self.custom_dir, old_should_drop))
-        if not self.download_file(remote_info["url"], temp_file, is_continue):
-            return -1
-            
-        # 方案变更时清除旧文件
-        self.clean_old_schema()
-        # 获取上次下载的压缩包的内容
-        old_files, old_dirs = self.get_old_file_list(target_file, temp_file)
-        if old_files or old_dirs:
-            self._delete_old_files(old_files, old_dirs)
-            print_warning("已移除上个版本的方案文件及残余文件夹")
+        is_continue = self._prepare_temp_file(temp_file, "temp_scheme*.zip")
+        self.pending = {
+            "url": remote_info["url"],
+            "save_path": temp_file,
+            "is_continue": is_continue,
+            # 已有未完成的完整下载时继续完整下载
+            "partial": self.use_partial_zip() and not is_continue,
+            "target_file": target_file,
+            "info": remote_info,
+            "fingerprint": fingerprint
+        }
+        return None
 
+    def stage_install(self, claimed=frozenset()) -> StagedInstall:
+        """解压已下载的方案到暂存目录（按安装清单清理的旧文件在提交更新时一并移除）"""
+        temp_file = self.pending["save_path"]
+        target_file = self.pending["target_file"]
+        remote_zip = self.pending.get("remote_zip")
+        manifest = InstallManifest.load(self.manifest_file)
+        legacy = not manifest.files
+        # 方案变更时清除旧文件
+        old_files, old_dirs = self.clean_old_schema(legacy)
+        if legacy and remote_zip is None:
+            # 没有安装清单（由旧版本工具安装）时，对比上次保存的压缩包获取已移除的文件
+            files, dirs = self.get_old_file_list(target_file, temp_file)
+            old_files += files
+            old_dirs += dirs
+        # 解压到暂存目录
+        staged = self.stage_zip(
+            remote_zip or temp_file,
+            self.extract_path,
+            manifest=manifest,
+            incremental=self.use_incremental_extract(),
+            claimed=claimed
+        )
+        if staged is None:
+            raise Exception("解压失败")
+        staged.old_files += old_files
+        staged.old_dirs += old_dirs
+        self.removes_old_version = bool(staged.old_files or staged.stale or staged.old_dirs)
+        return staged
 
-        # 应用更新
-        self.apply_update(temp_file, target_file, remote_info)
+    def finish_install(self) -> None:
+        """保存方案压缩包与更新记录"""
+        temp_file = self.pending["save_path"]
+        target_file = self.pending["target_file"]
+        remote_zip = self.pending.get("remote_zip")
+        for obsolete in self.obsolete_zips:
+            os.remove(obsolete)
+            print_warning("已移除旧方案zip文件")
+        if self.removes_old_version:
+            print_warning("已移除上个版本的方案文件及残余文件夹")
+        self._store_archive(temp_file, target_file, remote_zip)
+        # 保存记录
+        self.save_record(self.record_file, "scheme_file", self.scheme_file, self.pending["info"], self.pending.get("fingerprint"))
         # self.clean_build()
         print_success("方案更新完成")
-        return 1
 
     def get_local_time(self) -> Optional[datetime]:
         if not os.path.exists(self.record_file):
@@ -1337,29 +3076,15 @@ class SchemeUpdater(UpdateHandler):
 
     def file_compare(self, remote_hash, file2) -> bool:
         hash1 = remote_hash
-        hash2 = calculate_sha256(file2)
+        hash2 = calculate_sha256(file2, self.digest_cache)
         return hash1 == hash2
 
-    def apply_update(self, temp, target, info) -> None:
-        """
-        应用更新（替换文件）
-        Args:
-            temp (str): 临时文件路径
-            target (str): 目标文件路径
-            info (dict): 更新信息
-        """
-        if hasattr(self, 'terminate_processes'):
-            # 终止进程
-            self.terminate_processes()
-        # 解压文件
-        if not self.extract_zip(temp, self.extract_path):
-            raise Exception("解压失败")
-        # 解压成功重命名文件
-        if os.path.exists(target):
-            os.remove(target)
-        os.rename(temp, target)
-        # 保存记录
-        self.save_record(self.record_file, "scheme_file", self.scheme_file, info)
+    def installed_archive(self) -> str:
+        return os.path.join(self.custom_dir, self.scheme_file)
+
+    def owns_key(self, key) -> bool:
+        """方案压缩包附带的词库文件之后会被词库更新覆盖，由词库安装清单负责校验"""
+        return key.split('/', 1)[0] != self.config_manager.zh_dicts_dir
 
     def clean_build(self) -> None:
         """清理build目录"""
@@ -1368,23 +3093,42 @@ class SchemeUpdater(UpdateHandler):
             shutil.rmtree(build_dir)
             print_success("已清理build目录")
             
-    def clean_old_schema(self) -> None:
-        """当变更所使用的方案时，删除旧文件"""
+    def clean_old_schema(self, legacy=False) -> Tuple[List[str], List[str]]:
+        """
+        当变更所使用的方案时，旧zip文件在安装完成后删除
+        legacy为True（没有安装清单）时还需从旧zip中获取需要删除的旧文件（提交更新时删除）
+        """
+        old_files, old_dirs = [], []
+        self.obsolete_zips = []
         for file in os.listdir(self.custom_dir):
             if 'rime-wanxiang' in file and file != self.scheme_file:
-                old_schema_files, old_schema_dirs = self.get_old_file_list(file, None)
-                self._delete_old_files(old_schema_files, old_schema_dirs)
-                os.remove(os.path.join(self.custom_dir, file))
-                print_warning("已移除旧方案zip文件")
+                if legacy:
+                    old_schema_files, old_schema_dirs = self.get_old_file_list(os.path.join(self.custom_dir, file), None)
+                    old_files += old_schema_files
+                    old_dirs += old_schema_dirs
+                self.obsolete_zips.append(os.path.join(self.custom_dir, file))
+        return old_files, old_dirs
             
 
 # ====================== 词库更新 ======================
 class DictUpdater(UpdateHandler):
     """词库更新处理器"""
+    component_name = "词库"
+    update_title = "词库更新流程"
+    staging_name = "dict_staging"
+    owns_install_dir = True
+
     def __init__(self, config_manager):
         super().__init__(config_manager)
         self.target_tag = DICT_TAG
         self.record_file = os.path.join(self.custom_dir, "dict_record.json")
+        self.manifest_file = os.path.join(self.custom_dir, "dict_manifest.json")
+
+    def foreign_keys(self) -> Set[str]:
+        """只随方案压缩包发布的词库文件记录在方案安装清单中"""
+        prefix = self.config_manager.zh_dicts_dir + '/'
+        scheme_manifest = InstallManifest.load(os.path.join(self.custom_dir, "scheme_manifest.json"))
+        return {key[len(prefix):] for key in scheme_manifest.files if key.startswith(prefix)}
 
     def get_local_time(self) -> Optional[datetime]:
         """获取本地记录的更新时间"""
@@ -1400,33 +3144,7 @@ class DictUpdater(UpdateHandler):
 
     def file_compare(self, remote_hash, file2) -> bool:
         """sha256对比"""
-        return remote_hash == calculate_sha256(file2)
-
-    def apply_update(self, temp, target, info) -> None:
-        """应用更新（替换文件）， 参数不再需要传递路径，使用实例变量 """
-        try:
-            # 终止进程
-            if hasattr(self, 'terminate_processes'):
-                self.terminate_processes()
-            # 替换文件（使用明确的实例变量）
-            if os.path.exists(target):
-                os.remove(target)
-            os.rename(temp, target)
-            # 解压到配置目录
-            if not self.extract_zip(
-                target,
-                self.dict_extract_path,
-                is_dict=True
-            ):
-                raise Exception("解压失败")
-        
-            # 保存记录
-            self.save_record(self.record_file, "dict_file", self.dict_file, info)
-        except Exception as e:
-            # 清理残留文件
-            if os.path.exists(temp):
-                os.remove(temp)
-            raise
+        return remote_hash == calculate_sha256(file2, self.digest_cache)
 
     def run(self) -> int:
         """
@@ -1436,7 +3154,21 @@ class DictUpdater(UpdateHandler):
             0: 已经是最新/无可用更新
             1: 更新成功
         """
-        print_header("词库更新流程")
+        print_header(self.update_title)
+        status = self.prepare_download()
+        if status is not None:
+            return status
+        if not self.download_pending():
+            return -1
+        return self.install_update()
+
+    def prepare_download(self) -> Optional[int]:
+        """
+        检查是否需要下载，需要时生成待下载信息
+        return:
+            None: 需要下载（信息保存在self.pending中）
+            0: 已经是最新/无可用更新
+        """
         # 使用缓存信息而不是重复API调用
         remote_info = self.update_info
         # 如果没有缓存的更新信息或者本地比远程新，不需要更新
@@ -1455,54 +3187,114 @@ class DictUpdater(UpdateHandler):
         target_file = os.path.join(self.custom_dir, self.dict_file)
         # 校验本地文件和远端文件sha256
         if remote_info['sha256']:
-            if os.path.exists(target_file) and self.file_compare(remote_info['sha256'], target_file):
+            if self.is_installed(remote_info['sha256'], target_file, "dict_file", self.dict_file):
                 print_success("文件内容未变化，将更新本地保存的记录")
                 self.save_record(self.record_file, "dict_file", self.dict_file, remote_info)
                 return 0
+        # 对比远端文件指纹：每日重新发布但内容相同时只需一次HEAD请求
+        unchanged, fingerprint = self.content_unchanged(remote_info, "dict_file", self.dict_file)
+        if unchanged:
+            print_success("远端词库内容未变化，将更新本地保存的记录")
+            self.save_record(self.record_file, "dict_file", self.dict_file, remote_info, fingerprint)
+            return 0
 
         # 下载流程
         _suffix = remote_info['sha256'] or remote_info['id']
         temp_file = os.path.join(self.custom_dir, f"temp_dict_{_suffix}.zip")
-        if os.path.exists(temp_file):
-            is_continue = True
-        else:
-            is_continue = False
-            for old_should_drop in fnmatch.filter(os.listdir(self.custom_dir), "temp_dict*.zip"):
-                os.remove(os.path.join(self.custom_dir, old_should_drop))
-        if not self.download_file(remote_info["url"], temp_file, is_continue):
-            return -1
-        
+        is_continue = self._prepare_temp_file(temp_file, "temp_dict*.zip")
+        self.pending = {
+            "url": remote_info["url"],
+            "save_path": temp_file,
+            "is_continue": is_continue,
+            # 已有未完成的完整下载时继续完整下载
+            "partial": self.use_partial_zip() and not is_continue,
+            "target_file": target_file,
+            "info": remote_info,
+            "fingerprint": fingerprint
+        }
+        return None
+
+    def stage_install(self, claimed=frozenset()) -> StagedInstall:
+        """
+        解压已下载的词库到暂存目录（按安装清单清理的旧文件在提交更新时一并移除）
+        方案压缩包同样包含词库目录，同一会话中被方案改写的词库文件需要重新写入
+        """
+        temp_file = self.pending["save_path"]
+        target_file = self.pending["target_file"]
+        remote_zip = self.pending.get("remote_zip")
+        manifest = InstallManifest.load(self.manifest_file)
+        legacy = not manifest.files
         # 方案变更时清除旧文件
-        self.clean_old_dict()
-        # 获取上次下载的压缩包的内容
-        old_files, _ = self.get_old_file_list(target_file, temp_file, is_dict=True)
-        if old_files:
-            self._delete_old_files(old_files, _)
+        old_files, old_dirs = self.clean_old_dict(legacy)
+        if legacy and remote_zip is None:
+            # 没有安装清单（由旧版本工具安装）时，对比上次保存的压缩包获取已移除的文件
+            files, dirs = self.get_old_file_list(target_file, temp_file, is_dict=True)
+            old_files += files
+            old_dirs += dirs
+        # 解压到暂存目录
+        staged = self.stage_zip(
+            remote_zip or temp_file,
+            self.dict_extract_path,
+            manifest=manifest,
+            incremental=self.use_incremental_extract(),
+            claimed=claimed
+        )
+        if staged is None:
+            raise Exception("解压失败")
+        staged.old_files += old_files
+        staged.old_dirs += old_dirs
+        self.removes_old_version = bool(staged.old_files or staged.stale or staged.old_dirs)
+        return staged
+
+    def finish_install(self) -> None:
+        """保存词库压缩包与更新记录"""
+        temp_file = self.pending["save_path"]
+        target_file = self.pending["target_file"]
+        remote_zip = self.pending.get("remote_zip")
+        for obsolete in self.obsolete_zips:
+            os.remove(obsolete)
+            print_warning("已移除旧词库zip文件")
+        if self.removes_old_version:
             print_warning("已移除上个版本的词库文件")
-        
-        try:
-            self.apply_update(temp_file, target_file, remote_info)  # 传递三个参数
-            print_success("词库更新完成")
-            return 1
-        except Exception as e:
-            print_error(f"更新失败: {str(e)}")
-            # 回滚临时文件
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-            return -1
-            
-    def clean_old_dict(self) -> None:
-        """当变更所使用的方案时，删除旧文件"""
+        self._store_archive(temp_file, target_file, remote_zip)
+        # 保存记录
+        self.save_record(self.record_file, "dict_file", self.dict_file, self.pending["info"], self.pending.get("fingerprint"))
+        print_success("词库更新完成")
+
+    def install_dir(self) -> str:
+        return self.dict_extract_path
+
+    def installed_archive(self) -> str:
+        return os.path.join(self.custom_dir, self.dict_file)
+
+    def abort_install(self) -> None:
+        """回滚临时文件"""
+        temp_file = self.pending["save_path"]
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    def clean_old_dict(self, legacy=False) -> Tuple[List[str], List[str]]:
+        """
+        当变更所使用的方案时，旧zip文件在安装完成后删除
+        legacy为True（没有安装清单）时还需从旧zip中获取需要删除的旧文件（提交更新时删除）
+        """
+        old_files, old_dirs = [], []
+        self.obsolete_zips = []
         for file in os.listdir(self.custom_dir):
             if 'dicts.zip' in file and file != self.dict_file:
-                old_dict_files, _ = self.get_old_file_list(file, None, is_dict=True)
-                self._delete_old_files(old_dict_files, _)
-                os.remove(os.path.join(self.custom_dir, file))
-                print_warning("已移除旧词库zip文件")
+                if legacy:
+                    old_dict_files, _ = self.get_old_file_list(os.path.join(self.custom_dir, file), None, is_dict=True)
+                    old_files += old_dict_files
+                    old_dirs += _
+                self.obsolete_zips.append(os.path.join(self.custom_dir, file))
+        return old_files, old_dirs
 
 # ====================== 模型更新 ======================
 class ModelUpdater(UpdateHandler):
     """模型更新处理器"""
+    component_name = "模型"
+    update_title = "模型更新流程"
+
     def __init__(self, config_manager):
         super().__init__(config_manager)
         self.record_file = os.path.join(self.custom_dir, "model_record.json")
@@ -1510,12 +3302,18 @@ class ModelUpdater(UpdateHandler):
         self.model_file = "wanxiang-lts-zh-hans.gram"
         self.target_path = os.path.join(self.extract_path, self.model_file) 
 
-    def check_update(self) -> Optional[Dict]:
-        """检查模型更新"""
+    def release_url(self, use_mirror=None) -> Tuple[str, bool]:
+        """模型发布信息的URL，以及是否使用cnb镜像（默认按配置）"""
         url = f"https://api.github.com/repos/{OWNER}/{MODEL_REPO}/releases/tags/{MODEL_TAG}"
-        use_mirror = self.config_manager.config.getboolean('Settings', 'use_mirror', fallback=False)
+        if use_mirror is None:
+            use_mirror = self.config_manager.config.getboolean('Settings', 'use_mirror', fallback=False)
         if use_mirror:
             url = f"https://cnb.cool/{OWNER}/{CNB_REPO}/-/releases"
+        return url, use_mirror
+
+    def check_update(self, use_mirror=None) -> Optional[Dict]:
+        """检查模型更新（use_mirror默认按配置）"""
+        url, use_mirror = self.release_url(use_mirror)
         release = self.remote_api_request(
             url = url,
             use_mirror = use_mirror
@@ -1524,15 +3322,22 @@ class ModelUpdater(UpdateHandler):
             return None
             
         release = release[-1] if isinstance(release, list) else release
-        for asset in release.get("assets", []):
+        assets = release.get("assets", [])
+        for asset in assets:
             if asset["name"] == self.model_file:
+                # 随模型发布的分块校验文件（可选），用于增量更新
+                blocks_url = ""
+                for blocks_asset in assets:
+                    if blocks_asset["name"] == self.model_file + MODEL_BLOCKS_SUFFIX:
+                        blocks_url = blocks_asset.get("browser_download_url") or "https://cnb.cool" + blocks_asset.get("path")
                 return {
                     "url": asset.get("browser_download_url") or "https://cnb.cool" + asset.get("path"),
                     # 使用asset的更新时间
                     "update_time": asset.get("updated_at"),
                     "size": asset.get("size") or asset.get("sizeInByte"),
                     "sha256": asset.get("digest").split(':')[-1] if asset.get("digest") else "",
-                    "id": asset.get("id")
+                    "id": asset.get("id"),
+                    "blocks_url": blocks_url
                 }
         return None
 
@@ -1544,7 +3349,22 @@ class ModelUpdater(UpdateHandler):
             0: 已经是最新/无可用更新
             1: 更新成功
         """
-        print_header("模型更新流程")
+        print_header(self.update_title)
+        status = self.prepare_download()
+        if status is not None:
+            return status
+        if not self.download_pending():
+            print_error("模型下载失败")
+            return -1
+        return self.install_update()
+
+    def prepare_download(self) -> Optional[int]:
+        """
+        检查是否需要下载，需要时生成待下载信息
+        return:
+            None: 需要下载（信息保存在self.pending中）
+            0: 已经是最新/无可用更新
+        """
         # 使用缓存信息而不是重复API调用
         remote_info = self.update_info
         if not remote_info or not self.has_update():
@@ -1567,37 +3387,174 @@ class ModelUpdater(UpdateHandler):
             print_success("模型内容未变化，将更新本地保存的记录")
             self.save_record(self.record_file, "model_name", self.model_file, remote_info)
             return 0
+        fingerprint = {}
+        if os.path.exists(self.target_path):
+            # 对比远端文件指纹（ETag、大小），仅发布时间变化时不下载
+            unchanged, fingerprint = self.content_unchanged(remote_info, "model_name", self.model_file)
+            if unchanged:
+                print_success("远端模型内容未变化，将更新本地保存的记录")
+                self.save_record(self.record_file, "model_name", self.model_file, remote_info, fingerprint)
+                return 0
 
         # 下载到临时文件
         _suffix = remote_info['sha256'] or remote_info['id']
         temp_file = os.path.join(self.custom_dir, f"{self.model_file}_{_suffix}.tmp") 
-        if os.path.exists(temp_file):
-            is_continue = True
-        else:
-            is_continue = False
-            for old_should_drop in fnmatch.filter(os.listdir(self.custom_dir), f"{self.model_file}*.tmp"):
-                os.remove(os.path.join(self.custom_dir, old_should_drop))
-        if not self.download_file(remote_info["url"], temp_file, is_continue):
-            print_error("模型下载失败")
-            return -1
+        self.pending = {
+            "url": remote_info["url"],
+            "save_path": temp_file,
+            "is_continue": self._prepare_temp_file(temp_file, f"{self.model_file}*.tmp"),
+            "info": remote_info,
+            "fingerprint": fingerprint
+        }
+        return None
 
-        # 停止服务再覆盖
-        if hasattr(self, 'terminate_processes'):
-            self.terminate_processes()  # 复用终止进程逻辑
-        
-        # 覆盖目标文件
+    def _download_from(self, url, progress=None) -> bool:
+        """模型文件较大：发布了分块校验文件时优先增量更新，否则使用多连接分段下载"""
+        pending = self.pending
+        blocks_url = pending["info"].get("blocks_url")
+        if (blocks_url and not pending["is_continue"]
+                and self.config_manager.config.getboolean('Settings', 'model_delta', fallback=True)):
+            result = self.download_delta(
+                url, blocks_url, pending["save_path"],
+                progress=progress, expected_sha256=pending["info"].get("sha256")
+            )
+            if result is not None:
+                return result
+        connections = MEMORY.workers(self.config_manager.config.getint('Settings', 'model_segments', fallback=MODEL_DOWNLOAD_SEGMENTS))
+        segment_state = pending["save_path"] + ".segments.json"
+        # 已有单连接下载的残留文件时继续单连接续传
+        if connections > 1 and (not pending["is_continue"] or os.path.exists(segment_state)):
+            return self.download_file_segmented(
+                url, pending["save_path"], connections,
+                progress=progress, expected_sha256=pending["info"].get("sha256")
+            )
+        return super()._download_from(url, progress)
+
+    def download_delta(self, url, blocks_url, save_path, progress=None, expected_sha256=None) -> Optional[bool]:
+        """
+        增量更新模型：按发布的分块校验文件比对本地模型，相同的分块直接从本地复制，
+        只通过范围请求下载变化的分块，重建后校验SHA256
+        本地分块只在对齐位置参与匹配（纯Python滚动校验对数百MB文件过慢），
+        适用于原位修改为主的模型更新
+        Args:
+            url (str): 模型下载链接
+            blocks_url (str): 分块校验文件链接
+            save_path (str): 保存路径
+            progress (DownloadProgress): 共享的汇总进度条（并发下载时传入）
+            expected_sha256 (str): 期望的SHA256
+        Returns:
+            True: 增量更新成功
+            False: 重建完成但校验失败
+            None: 无法增量更新（本地无模型、变化过多、服务器不支持范围请求等），应完整下载
+        """
+        if not os.path.exists(self.target_path):
+            return None
         try:
-            if os.path.exists(self.target_path):
-                os.remove(self.target_path)
-            os.replace(temp_file, self.target_path)  # 原子操作更安全
-            self.save_record(self.record_file, "model_name", self.model_file, remote_info)
+            response = self.http.get(blocks_url)
+            response.raise_for_status()
+            index = response.json()
+            block_size = int(index["block_size"])
+            total_size = int(index["length"])
+            remote_blocks = index["blocks"]
         except Exception as e:
-            print_error(f"模型文件替换失败: {str(e)}")
-            return -1
-        
-        # 返回更新成功状态
+            print_warning(f"获取模型分块校验信息失败，使用完整下载: {str(e)}")
+            return None
+        if not index.get("sha256"):
+            # 没有整体校验值就无法确认重建结果正确
+            print_warning("模型分块校验信息缺少SHA256，使用完整下载")
+            return None
+
+        # 本地模型按相同分块大小建立索引：分块校验值 → 本地偏移
+        local_blocks = {}
+        with open(self.target_path, 'rb') as f:
+            offset = 0
+            for block in iter(lambda: f.read(block_size), b""):
+                local_blocks.setdefault(hashlib.sha1(block).hexdigest(), offset)
+                offset += len(block)
+
+        def block_range(index_):
+            start = index_ * block_size
+            return start, min(start + block_size, total_size) - 1
+
+        missing = [i for i, block_hash in enumerate(remote_blocks) if block_hash not in local_blocks]
+        missing_bytes = sum(block_range(i)[1] - block_range(i)[0] + 1 for i in missing)
+        if missing_bytes > total_size * MODEL_DELTA_MAX_RATIO:
+            print_warning("模型变化部分较多，使用完整下载")
+            return None
+
+        # 合并相邻的变化分块，减少请求次数
+        ranges = []
+        for i in missing:
+            start, end = block_range(i)
+            if ranges and ranges[-1][1] + 1 == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+
+        delta_path = save_path + ".delta"
+        own_progress = progress is None
+        if own_progress:
+            progress = DownloadProgress(desc="增量下载中")
+        try:
+            # 先用本地相同分块重建文件
+            with open(delta_path, 'wb') as out, open(self.target_path, 'rb') as local:
+                out.truncate(total_size)
+                for i, block_hash in enumerate(remote_blocks):
+                    if block_hash in local_blocks:
+                        start, end = block_range(i)
+                        local.seek(local_blocks[block_hash])
+                        out.seek(start)
+                        out.write(local.read(end - start + 1))
+
+            def fetch_range(byte_range):
+                start, end = byte_range
+                with self.http.get(url, headers={'Range': f'bytes={start}-{end}'}, stream=True) as response:
+                    if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(f'bytes {start}-'):
+                        raise Exception(f"服务器不支持范围请求: HTTP {response.status_code}")
+                    written = 0
+                    with open(delta_path, 'r+b') as out:
+                        out.seek(start)
+                        for data in response.iter_content(65536):
+                            out.write(data)
+                            written += len(data)
+                            progress.update(len(data))
+                if written != end - start + 1:
+                    raise Exception(f"范围 {start}-{end} 数据不完整")
+
+            progress.add_total(missing_bytes)
+            connections = MEMORY.workers(self.config_manager.config.getint('Settings', 'model_segments', fallback=MODEL_DOWNLOAD_SEGMENTS))
+            with ThreadPoolExecutor(max_workers=connections) as executor:
+                list(executor.map(fetch_range, ranges))
+        except Exception as e:
+            print_warning(f"增量更新失败，使用完整下载: {str(e)}")
+            self._remove_file(delta_path)
+            return None
+        finally:
+            if own_progress:
+                progress.close()
+
+        digest = calculate_sha256(delta_path)
+        if digest != index["sha256"]:
+            print_warning("增量重建结果校验失败，使用完整下载")
+            self._remove_file(delta_path)
+            return None
+        os.replace(delta_path, save_path)
+        print_success(f"增量更新：仅下载 {missing_bytes / 1024 / 1024:.1f}MB（共 {total_size / 1024 / 1024:.1f}MB）")
+        return self._verify_download(save_path, digest, expected_sha256)
+
+    def stage_install(self, claimed=frozenset()) -> StagedFile:
+        """模型已下载校验完毕，提交时只需一次重命名"""
+        return StagedFile(
+            self.pending["save_path"],
+            self.target_path,
+            os.path.join(self.custom_dir, self.model_file + ".backup")
+        )
+
+    def finish_install(self) -> None:
+        """保存更新记录"""
+        self._remember_digest(self.pending["save_path"], self.target_path)
+        self.save_record(self.record_file, "model_name", self.model_file, self.pending["info"], self.pending.get("fingerprint"))
         print_success("模型更新完成")
-        return 1
 
     def get_local_time(self) -> Optional[datetime]:
         if not os.path.exists(self.record_file):
@@ -1610,11 +3567,15 @@ class ModelUpdater(UpdateHandler):
         except:
             return None
 
+    def _archive_matches_install(self, url) -> bool:
+        """模型不是压缩包，只对比HEAD指纹"""
+        return False
+
     def _check_hash_match(self, remote_info) -> bool:
         """检查临时文件与目标文件哈希是否一致"""
         temp_hash = remote_info['sha256']
         if temp_hash:
-            target_hash = calculate_sha256(self.target_path) if os.path.exists(self.target_path) else None
+            target_hash = calculate_sha256(self.target_path, self.digest_cache) if os.path.exists(self.target_path) else None
             return temp_hash == target_hash
         return False
 
@@ -1624,8 +3585,12 @@ class ScriptUpdater(UpdateHandler):
         super().__init__(config_manager)
         self.script_path = os.path.abspath(__file__)
 
+    def release_url(self) -> Tuple[str, bool]:
+        """脚本发布信息的URL（始终使用GitHub）"""
+        return "https://api.github.com/repos/expoli/rime-wanxiang-update-tools/releases", False
+
     def check_update(self) -> Optional[Dict]:
-        releases = self.remote_api_request("https://api.github.com/repos/expoli/rime-wanxiang-update-tools/releases")
+        releases = self.remote_api_request(self.release_url()[0])
         if not releases:
             return None
         
@@ -1643,16 +3608,21 @@ class ScriptUpdater(UpdateHandler):
                 }
             
     def update_script(self, url: str) -> bool:
-        """更新脚本"""
-        res = self.remote_api_request(url=url, output_json=False)
-        if res.status_code == 200:
-            with open(self.script_path, 'wb') as f:
-                f.write(res.content)
-            print_success("脚本更新成功，请重新运行脚本（iOS用户请退出当前软件重新启动）")
-            return True
-        else:
+        """更新脚本（分块写入临时文件，完整下载后再替换当前脚本）"""
+        temp_file = self.script_path + ".tmp"
+        try:
+            with self.http.get(url, headers={"User-Agent": "RIME-Updater/1.0"}, stream=True) as res:
+                res.raise_for_status()
+                with open(temp_file, 'wb') as f:
+                    for data in res.iter_content(MEMORY.buffer(EXTRACT_BUFFER_SIZE)):
+                        f.write(data)
+            os.replace(temp_file, self.script_path)
+        except Exception:
+            self._remove_file(temp_file)
             print_error("脚本更新失败，请检查网络连接或手动下载最新脚本")
             return False
+        print_success("脚本更新成功，请重新运行脚本（iOS用户请退出当前软件重新启动）")
+        return True
         
     def compare_version(self, local_version: str, remote_version: str) -> bool:
         if not local_version.startswith('v'):
@@ -1677,24 +3647,120 @@ class ScriptUpdater(UpdateHandler):
             return False
 
 # ====================== 工具函数 ======================
-def calculate_sha256(file_path) -> Optional[str]:
+def build_block_index(file_path, block_size=MODEL_DELTA_BLOCK_SIZE) -> Dict:
+    """
+    生成模型分块校验文件的内容（与模型一同以 MODEL_FILE + MODEL_BLOCKS_SUFFIX 发布后即可增量更新）
+    Args:
+        file_path (str): 模型文件路径
+        block_size (int): 分块大小
+    Returns:
+        dict: {"block_size", "length", "sha256", "blocks": 各分块的SHA1}
+    """
+    blocks = []
+    sha256_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            blocks.append(hashlib.sha1(block).hexdigest())
+            sha256_hash.update(block)
+    return {
+        "block_size": block_size,
+        "length": os.path.getsize(file_path),
+        "sha256": sha256_hash.hexdigest(),
+        "blocks": blocks
+    }
+
+def calculate_sha256(file_path, digest_cache=None) -> Optional[str]:
     """
     计算文件SHA256值
     Args:
         file_path (str): 文件路径
+        digest_cache (DigestCache): 文件摘要缓存，文件未变化时直接返回缓存结果
     Returns:
         str: SHA256值
     """
-    sha256_hash = hashlib.sha256()
+    if digest_cache is not None:
+        cached = digest_cache.get(file_path)
+        if cached:
+            return cached
     try:
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+：直接读入内部缓冲区，避免额外的内存拷贝
+                digest = hashlib.file_digest(f, 'sha256').hexdigest()
+            else:
+                sha256_hash = hashlib.sha256()
+                for byte_block in iter(lambda: f.read(MEMORY.buffer(HASH_BUFFER_SIZE)), b""):
+                    sha256_hash.update(byte_block)
+                digest = sha256_hash.hexdigest()
+        if digest_cache is not None:
+            digest_cache.put(file_path, digest)
+        return digest
     except Exception as e:
         print_error(f"计算哈希失败: {str(e)}")
         return None
     
+def calculate_crc32(file_path) -> Optional[int]:
+    """计算文件CRC32值（与压缩包记录的CRC一致），读取失败时返回None"""
+    try:
+        crc = 0
+        with open(file_path, "rb") as f:
+            for byte_block in iter(lambda: f.read(MEMORY.buffer(HASH_BUFFER_SIZE)), b""):
+                crc = zlib.crc32(byte_block, crc)
+        return crc
+    except OSError:
+        return None
+
+def print_download_source(use_mirror) -> None:
+    """提示当前使用的下载源"""
+    if use_mirror:
+        print(f"{COLOR['OKBLUE']}[i] 正在使用 https://cnb.cool 下载{COLOR['ENDC']}")
+        # print(f"{COLOR['WARNING']}注意: 如果使用代理，请确保关闭后再尝试下载{COLOR['ENDC']}")
+    else:
+        print(f"{COLOR['OKCYAN']}[i] 正在使用 https://github.com 下载{COLOR['ENDC']}")
+
+
+class DownloadProgress:
+    """多个并发下载共享的汇总进度条"""
+    def __init__(self, desc="下载中"):
+        self._lock = threading.Lock()
+        self.bar = tqdm(total=0, unit='B', unit_scale=True, desc=desc)
+
+    def add_total(self, size, initial=0) -> None:
+        """登记一个下载任务的总大小及已完成部分（断点续传）"""
+        with self._lock:
+            self.bar.total += size
+            self.bar.update(initial)
+
+    def update(self, size) -> None:
+        with self._lock:
+            self.bar.update(size)
+
+    def close(self) -> None:
+        self.bar.close()
+
+
+def download_concurrently(updaters, max_workers=DOWNLOAD_CONCURRENCY) -> Dict:
+    """
+    并发下载多个更新器的待下载文件，使用一个汇总进度条
+    Args:
+        updaters (list): 已通过prepare_download生成待下载信息的更新器
+        max_workers (int): 最大并发数
+    Returns:
+        dict: 更新器 → 是否下载成功
+    """
+    if not updaters:
+        return {}
+    # 自动选源时由各组件分别提示所选的下载源
+    if not updaters[0].config_manager.config.getboolean('Settings', 'auto_source', fallback=False):
+        print_download_source(updaters[0].use_mirror)
+    progress = DownloadProgress()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {updater: executor.submit(updater.download_pending, progress) for updater in updaters}
+            return {updater: future.result() for updater, future in futures.items()}
+    finally:
+        progress.close()
+
 def print_update_status(scheme_updater, dict_updater, model_updater, script_updater) -> None:
     """打印更新状态信息"""
     # 检查哪些组件有更新
@@ -1768,6 +3834,48 @@ def print_update_status(scheme_updater, dict_updater, model_updater, script_upda
     if not (has_scheme_update or has_dict_update or has_model_update):
         print(f"\n{COLOR['OKGREEN']}[√] 所有组件均为最新版本{COLOR['ENDC']}")
 
+def install_updates(config_manager, component_updaters) -> Tuple[Dict, UpdateSession]:
+    """
+    检查、同时下载并统一安装组件更新（不部署）
+    Args:
+        config_manager (ConfigManager): 配置管理器
+        component_updaters (list): 方案、词库、模型更新器
+    Returns:
+        tuple: (更新器 → 结果(1: 更新成功，0: 无需更新，-1: 更新失败), 更新会话)
+    """
+    # 检查阶段：确定需要下载的组件
+    results = {updater: 0 for updater in component_updaters}
+    session = UpdateSession()
+    pending_updaters = []
+    for updater in component_updaters:
+        if not updater.has_update():
+            continue
+        print_header(updater.update_title)
+        status = updater.prepare_download()
+        if status is None:
+            pending_updaters.append(updater)
+        else:
+            results[updater] = status
+
+    # 下载阶段：所有组件同时下载
+    if pending_updaters:
+        print_header("下载更新文件")
+        max_workers = MEMORY.workers(config_manager.config.getint('Settings', 'download_concurrency', fallback=DOWNLOAD_CONCURRENCY))
+        downloaded = download_concurrently(pending_updaters, max_workers)
+        failed = [updater for updater in pending_updaters if not downloaded.get(updater)]
+        for updater in failed:
+            print_error(f"{updater.component_name}下载失败")
+        if failed:
+            # 整体更新：任一组件下载失败时不安装其他组件
+            print_warning("存在下载失败的组件，本次不安装任何更新")
+            for updater in pending_updaters:
+                results[updater] = -1
+        else:
+            # 安装阶段：全部下载完成后统一安装，只停止一次输入法服务
+            print_header("安装更新")
+            results.update(session.install(pending_updaters))
+    return results, session
+
 def perform_auto_update(
     config_manager: ConfigManager, 
     combined_updater: Optional[CombinedUpdater] = None,
@@ -1791,7 +3899,7 @@ def perform_auto_update(
             print(f"{COLOR['BLUE']}请求 {request_target} 中...{COLOR['ENDC']}")
         
         combined_updater = CombinedUpdater(config_manager)
-        combined_updater.fetch_all_updates()
+        UpdateCheckEngine(combined_updater).run()
     # 获取各个更新器的实例
     script_updater = combined_updater.script_updater
     scheme_updater = combined_updater.scheme_updater
@@ -1805,17 +3913,9 @@ def perform_auto_update(
     if script_updater.update_info:
         script_updater.run()
         
-    # 初始化更新状态
-    scheme_updated = 0
-    dict_updated = 0
-    model_updated = 0
-    if scheme_updater.has_update():
-        scheme_updated = scheme_updater.run()
-    if dict_updater.has_update():
-        dict_updated = dict_updater.run()
-    if model_updater.has_update():
-        model_updated = model_updater.run()
-    updated = [scheme_updated, dict_updated, model_updated]
+    component_updaters = [scheme_updater, dict_updater, model_updater]
+    results, session = install_updates(config_manager, component_updaters)
+    updated = [results[updater] for updater in component_updaters]
     # 部署逻辑
     deployer = scheme_updater
     if SYSTEM_TYPE == 'windows':
@@ -1826,7 +3926,7 @@ def perform_auto_update(
             print("\n" + COLOR['OKGREEN'] + "[√] 无需更新，跳过部署步骤" + COLOR['ENDC'])
         else:
             print_header("重新部署输入法")
-            if deployer.deploy_weasel():
+            if deployer.deploy_weasel(stop_service=not session.service_stopped):
                 print_success("部署成功")
             else:
                 print_warning("部署失败，请检查日志")
@@ -1888,9 +3988,9 @@ def create_and_show_updates(config_manager, show=True) -> CombinedUpdater:
             request_target = "api.github.com"
         print(f"{COLOR['BLUE']}请求 {request_target} 中...{COLOR['ENDC']}")
     
-    # 创建组合更新器并获取所有更新信息
+    # 创建组合更新器并并发获取所有更新信息
     combined_updater = CombinedUpdater(config_manager)
-    combined_updater.fetch_all_updates()
+    UpdateCheckEngine(combined_updater).run()
     
     # 获取各个更新器的实例
     script_updater = combined_updater.script_updater
@@ -1917,8 +4017,198 @@ def open_config_file(config_path) -> None:
         except:
             print_warning("无法打开配置文件，请手动编辑。")
 
+# ====================== 无人值守模式 ======================
+def _check_state_file() -> str:
+    return os.path.join(os.path.dirname(ConfigManager._get_config_path()), CHECK_STATE_FILE)
+
+
+def _stat_mtime(path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_check_state() -> Optional[Dict]:
+    """
+    快速路径：上次联网检查未发现更新、仍在检查间隔内，且配置文件与更新记录均未变化时返回上次的检查结果
+    只读取两个小文件，不加载配置管理器也不发起网络请求
+    """
+    config_path = ConfigManager._get_config_path()
+    config = configparser.ConfigParser()
+    try:
+        config.read(config_path, encoding='utf-8')
+        interval = config.getint('Settings', 'check_interval', fallback=CHECK_INTERVAL)
+        with open(_check_state_file(), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except Exception:
+        return None
+    if interval <= 0 or not 0 <= time.time() - state.get("checked_at", 0) < interval:
+        return None
+    if state.get("config_mtime_ns") != _stat_mtime(config_path):
+        return None
+    if any(_stat_mtime(path) != mtime for path, mtime in state.get("records", {}).items()):
+        return None
+    return state
+
+
+def save_check_state(component_updaters) -> None:
+    """记录本次联网检查未发现更新（组件更新记录变化或配置修改后失效）"""
+    state = {
+        "checked_at": time.time(),
+        "config_mtime_ns": _stat_mtime(ConfigManager._get_config_path()),
+        "records": {updater.record_file: _stat_mtime(updater.record_file) for updater in component_updaters}
+    }
+    try:
+        with open(_check_state_file(), 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+    except Exception as e:
+        print_warning(f"保存检查结果失败: {str(e)}")
+
+
+def clear_check_state() -> None:
+    try:
+        os.remove(_check_state_file())
+    except OSError:
+        pass
+
+
+def _component_status(updater, plan_entry) -> Dict:
+    """无人值守模式输出的组件状态"""
+    info = plan_entry["info"] or {}
+    local_time = updater.get_local_time()
+    return {
+        "available": plan_entry["has_update"],
+        "tag": info.get("tag"),
+        "remote_time": info.get("update_time"),
+        "local_time": local_time.strftime("%Y-%m-%dT%H:%M:%SZ") if local_time else None,
+    }
+
+
+def run_headless(apply=False, force=False) -> Tuple[int, Dict]:
+    """
+    无人值守检查/更新：不提示、不等待，不更新脚本本身
+    Args:
+        apply (bool): 是否下载并安装可用更新（否则只检查）
+        force (bool): 忽略检查间隔，始终联网检查
+    Returns:
+        tuple: (退出码, 输出的结果)
+    """
+    report = {"mode": "apply" if apply else "check", "fast_path": False, "components": {}}
+    if not force:
+        state = load_check_state()
+        if state is not None:
+            report["fast_path"] = True
+            report["checked_at"] = datetime.fromtimestamp(state["checked_at"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            return EXIT_UP_TO_DATE, report
+
+    config_manager = ConfigManager(interactive=False)
+    combined_updater = CombinedUpdater(config_manager)
+    plan = UpdateCheckEngine(combined_updater).run()
+    components = (
+        ("scheme", combined_updater.scheme_updater),
+        ("dict", combined_updater.dict_updater),
+        ("model", combined_updater.model_updater),
+    )
+    for name, updater in components:
+        report["components"][name] = _component_status(updater, plan[name])
+    script_info = plan["script"]["info"] or {}
+    report["script"] = {"available": plan["script"]["has_update"], "tag": script_info.get("tag")}
+
+    missing = [name for name, _ in components if plan[name]["info"] is None]
+    if missing:
+        report["error"] = f"未获取到发布信息: {', '.join(missing)}"
+        return EXIT_FAILED, report
+    component_updaters = [updater for _, updater in components]
+    if not any(plan[name]["has_update"] for name, _ in components):
+        save_check_state(component_updaters)
+        return EXIT_UP_TO_DATE, report
+    clear_check_state()
+    if not apply:
+        return EXIT_UPDATES_AVAILABLE, report
+
+    results, session = install_updates(config_manager, component_updaters)
+    result_names = {1: "updated", 0: "unchanged", -1: "failed"}
+    for name, updater in components:
+        report["components"][name]["result"] = result_names[results[updater]]
+    if -1 in results.values():
+        return EXIT_FAILED, report
+    if 1 not in results.values():
+        # 发布时间变化但内容未变化：已更新记录，无需部署
+        save_check_state(component_updaters)
+        return EXIT_UP_TO_DATE, report
+
+    deployer = combined_updater.scheme_updater
+    if SYSTEM_TYPE == 'windows':
+        report["deployed"] = deployer.deploy_weasel(stop_service=not session.service_stopped)
+    elif SYSTEM_TYPE == 'macos':
+        report["deployed"] = deployer.deploy_for_mac(wait=False)
+    else:
+        report["deployed"] = None  # 需手动部署
+    return EXIT_UPDATED, report
+
+
+def print_headless_report(exit_code, report) -> None:
+    """以文本形式输出无人值守模式的结果"""
+    names = {"scheme": "方案", "dict": "词库", "model": "模型"}
+    if report["fast_path"]:
+        print(f"[i] {report['checked_at']} 检查时已是最新版本，未到检查间隔")
+    for key, status in report["components"].items():
+        state = "有可用更新" if status["available"] else "已是最新"
+        result = {"updated": "，已更新", "unchanged": "，内容未变化", "failed": "，更新失败"}.get(status.get("result"), "")
+        print(f"{names[key]}: {state}{result}（{status.get('tag') or '未知版本'}）")
+    if report.get("script", {}).get("available"):
+        print(f"脚本: 有可用更新（{report['script']['tag']}），请交互运行脚本更新")
+    deployed = report.get("deployed", True)
+    if deployed is False:
+        print("部署失败，请手动部署输入法")
+    elif deployed is None:
+        print("请手动部署输入法")
+    if report.get("error"):
+        print(f"错误: {report['error']}")
+
+
+def headless_main(args) -> int:
+    """--check/--apply入口：--json时标准输出只包含结果JSON，过程信息输出到标准错误"""
+    start = time.perf_counter()
+    output = sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+            exit_code, report = run_headless(apply=args.apply, force=args.force)
+    except SystemExit as e:
+        # 配置校验失败等路径会直接退出
+        exit_code = EXIT_FAILED
+        report = {"mode": "apply" if args.apply else "check", "fast_path": False, "components": {}, "error": f"程序退出: {e.code}"}
+    except Exception as e:
+        exit_code = EXIT_FAILED
+        report = {"mode": "apply" if args.apply else "check", "fast_path": False, "components": {}, "error": str(e)}
+    report["exit_code"] = exit_code
+    report["elapsed"] = round(time.perf_counter() - start, 3)
+    if args.json:
+        json.dump(report, output, ensure_ascii=False)
+        output.write("\n")
+    else:
+        print_headless_report(exit_code, report)
+    return exit_code
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="万象方案、词库及模型更新工具（不带参数时进入交互菜单）")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="只检查更新（有更新时退出码为2）")
+    mode.add_argument("--apply", action="store_true", help="下载并安装可用更新（已更新时退出码为3）")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--force", action="store_true", help="忽略检查间隔，始终联网检查")
+    return parser.parse_args(argv)
+
+
 # ====================== 主程序 ======================
 def main():
+    args = parse_args()
+    if args.check or args.apply:
+        # 无人值守模式：不显示菜单、不提示、不等待，以退出码表示结果
+        sys.exit(headless_main(args))
+
     print(f"\n{COLOR['OKCYAN']}[i] 当前系统为：{SYSTEM_TYPE} {COLOR['ENDC']}")
     if UPDATE_TOOLS_VERSION.startswith("DEFAULT"):
         print(f"{COLOR['WARNING']}[!] 您下载的是非发行版脚本，请勿直接使用，请去 releases 页面下载最新版本：https://github.com/expoli/rime-wanxiang-update-tools/releases{COLOR['ENDC']}")
@@ -1948,8 +4238,8 @@ def main():
         while True:
             # 选择更新类型
             print_header("更新类型选择") 
-            print("[1] 词库更新\n[2] 方案更新\n[3] 模型更新\n[4] 自动更新\n[5] 脚本更新\n[6] 修改配置\n[7] 退出程序")
-            choice = input("请输入选择（1-7，单独按回车键默认选择自动更新）: ").strip() or '4'
+            print("[1] 词库更新\n[2] 方案更新\n[3] 模型更新\n[4] 自动更新\n[5] 脚本更新\n[6] 修改配置\n[7] 退出程序\n[8] 校验安装文件")
+            choice = input("请输入选择（1-8，单独按回车键默认选择自动更新）: ").strip() or '4'
             
             if choice == '6':
                 # 修改配置
@@ -1959,8 +4249,11 @@ def main():
                 # 返回主菜单或退出
                 user_choice = input("\n按回车键返回主菜单，或输入其他键退出: ").strip().lower()
                 if user_choice == '':
-                    # 重新加载配置
-                    config_manager = ConfigManager()
+                    # 重新加载配置（沿用已获取的发布信息）
+                    config_manager = ConfigManager(
+                        release_catalog=config_manager.release_catalog,
+                        http=config_manager.http
+                    )
                     # 重置更新器
                     combined_updater = None
                     # 重新创建并显示更新信息
@@ -1969,6 +4262,30 @@ def main():
                     break
             elif choice == '7':
                 break
+            elif choice == '8':
+                # 校验安装文件并按需修复
+                if not combined_updater:
+                    combined_updater = create_and_show_updates(config_manager)
+                repaired = False
+                for updater in (combined_updater.scheme_updater, combined_updater.dict_updater):
+                    print_header(f"校验{updater.component_name}文件")
+                    report = updater.verify_install()
+                    if report and (report["modified"] or report["missing"]):
+                        if input(f"是否恢复被修改或缺失的{updater.component_name}文件(y/n)? ").strip().lower() == 'y':
+                            repaired = updater.repair_install(report) or repaired
+                if repaired:
+                    if SYSTEM_TYPE == 'windows':
+                        print_header("重新部署输入法")
+                        if combined_updater.scheme_updater.deploy_weasel():
+                            print_success("部署成功")
+                        else:
+                            print_warning("部署失败，请检查日志")
+                    elif SYSTEM_TYPE == 'macos':
+                        print_header("重新部署输入法")
+                        combined_updater.scheme_updater.deploy_for_mac()
+                    else:
+                        print_warning("请手动部署输入法")
+                continue
             elif choice == '5':
                 # 脚本更新
                 script_updater = ScriptUpdater(config_manager)
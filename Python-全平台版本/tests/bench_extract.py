@@ -0,0 +1,71 @@
+"""
+解压性能基准：生成与词库结构相似的压缩包（deflate压缩、20个子目录），
+分别计时完整解压（stage_zip + 提交）与zipfile.extractall作为参照
+运行: python Python-全平台版本/tests/bench_extract.py [成员数 ...]
+"""
+import configparser
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Python", "万象下载更新.py")
+spec = importlib.util.spec_from_file_location("wanxiang_update", SCRIPT)
+wx = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(wx)
+
+
+def make_archive(path, count):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        for i in range(count):
+            z.writestr(f"wanxiang/dicts/d{i % 20}/w{i}.dict.yaml", f"词条{i}\tci tiao\t{i}\n" * 20)
+
+
+def make_updater(root):
+    """不读取settings.ini的词库更新器（只设置解压用到的属性）"""
+    config = configparser.ConfigParser()
+    config['Settings'] = {}
+    updater = wx.DictUpdater.__new__(wx.DictUpdater)
+    updater.config_manager = type('Config', (), {'config': config, 'zh_dicts_dir': 'dicts'})()
+    updater.exclude_matcher = wx.ExcludeMatcher([])
+    updater.custom_dir = os.path.join(root, 'UpdateCache')
+    os.makedirs(updater.custom_dir)
+    return updater
+
+
+def bench(count):
+    root = tempfile.mkdtemp()
+    try:
+        archive = os.path.join(root, 'dicts.zip')
+        make_archive(archive, count)
+        updater = make_updater(root)
+
+        start = time.perf_counter()
+        staged = updater.stage_zip(archive, os.path.join(root, 'out'))
+        wx.ZipIndex.close_all()
+        staged.commit()
+        staged.finalize()
+        staged_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with zipfile.ZipFile(archive) as z:
+            z.extractall(os.path.join(root, 'reference'))
+        reference_seconds = time.perf_counter() - start
+        return staged_seconds, reference_seconds
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [5000, 10000]
+    results = [(count,) + bench(count) for count in counts]
+    print()
+    for count, staged_seconds, reference_seconds in results:
+        print(f"{count:>6} 个成员: stage_zip+提交 {staged_seconds:.2f}s, zipfile.extractall {reference_seconds:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+远程压缩包按需读取（partial_zip）的本地测试
+启动支持/不支持范围请求的本地HTTP服务器，验证HttpRangeFile探测、增量暂存只下载变化的成员，
+以及服务器不支持范围请求时回退为完整下载
+运行: python -m unittest discover -s Python-全平台版本/tests
+"""
+import configparser
+import hashlib
+import http.server
+import importlib.util
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+import zipfile
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Python", "万象下载更新.py")
+spec = importlib.util.spec_from_file_location("wanxiang_update", SCRIPT)
+wx = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(wx)
+
+
+class RangeServer:
+    """本地静态文件服务器，ranges为False时忽略Range请求头并返回完整内容"""
+    def __init__(self, root, ranges=True):
+        self.requests = []
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(self.headers.get('Range'))
+                path = os.path.join(root, self.path.lstrip('/'))
+                if not os.path.isfile(path):
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                with open(path, 'rb') as f:
+                    data = f.read()
+                match = re.match(r'bytes=(\d*)-(\d*)$', self.headers.get('Range') or '')
+                if ranges and match:
+                    start, end = match.groups()
+                    if start == '':
+                        start, end = max(0, len(data) - int(end)), len(data) - 1
+                    else:
+                        start, end = int(start), min(int(end) if end else len(data) - 1, len(data) - 1)
+                    body = data[start:end + 1]
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+                else:
+                    body = data
+                    self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 探测请求收到200后不读取响应体直接关闭连接
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_zip(path, files):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        for name, content in files.items():
+            z.writestr(name, content)
+
+
+def make_updater(root):
+    """不读取settings.ini的词库更新器（只设置暂存与下载用到的属性）"""
+    config = configparser.ConfigParser()
+    config['Settings'] = {'partial_zip': 'true'}
+    http_transport = wx.HttpTransport()
+    updater = wx.DictUpdater.__new__(wx.DictUpdater)
+    updater.config_manager = type('Config', (), {'config': config, 'http': http_transport, 'zh_dicts_dir': 'dicts'})()
+    updater.http = http_transport
+    updater.use_mirror = False
+    updater.exclude_matcher = wx.ExcludeMatcher([])
+    updater.custom_dir = os.path.join(root, 'UpdateCache')
+    updater.dict_extract_path = os.path.join(root, 'dicts')
+    updater.manifest_file = os.path.join(updater.custom_dir, 'dict_manifest.json')
+    updater.download_digests = {}
+    os.makedirs(updater.custom_dir)
+    return updater
+
+
+class RangeZipTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.files = {f'dicts/f{i}.dict.yaml': os.urandom(100000) for i in range(20)}
+        make_zip(os.path.join(self.root, 'v1.zip'), self.files)
+        self.files_v2 = dict(self.files)
+        self.files_v2['dicts/f3.dict.yaml'] = b'changed' * 1000
+        del self.files_v2['dicts/f7.dict.yaml']
+        self.files_v2['dicts/new.dict.yaml'] = '新词'.encode()
+        make_zip(os.path.join(self.root, 'v2.zip'), self.files_v2)
+        self.server = RangeServer(self.root)
+        self.plain_server = RangeServer(self.root, ranges=False)
+        self.updater = make_updater(self.root)
+
+    def tearDown(self):
+        wx.ZipIndex.close_all()
+        self.server.close()
+        self.plain_server.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def install(self, source, incremental):
+        manifest = wx.InstallManifest.load(self.updater.manifest_file)
+        staged = self.updater.stage_zip(source, self.updater.dict_extract_path, manifest=manifest, incremental=incremental)
+        wx.ZipIndex.close_all()
+        self.assertIsNotNone(staged)
+        staged.commit()
+        staged.finalize()
+        return staged
+
+    def test_open_probes_range_support(self):
+        remote = wx.HttpRangeFile.open(self.updater.http, self.server.url + 'v2.zip')
+        self.assertIsNotNone(remote)
+        self.assertEqual(remote.size, os.path.getsize(os.path.join(self.root, 'v2.zip')))
+        self.assertIsNone(wx.HttpRangeFile.open(self.updater.http, self.plain_server.url + 'v2.zip'))
+
+    def test_partial_stage_fetches_only_changed_members(self):
+        self.install(os.path.join(self.root, 'v1.zip'), incremental=False)
+        remote = wx.HttpRangeFile.open(self.updater.http, self.server.url + 'v2.zip')
+        staged = self.install(remote, incremental=True)
+
+        self.assertEqual(sorted(key for key, *_ in staged.written), ['f3.dict.yaml', 'new.dict.yaml'])
+        self.assertLess(remote.bytes_fetched, remote.size / 4)
+        target = self.updater.dict_extract_path
+        self.assertFalse(os.path.exists(os.path.join(target, 'f7.dict.yaml')))
+        for name, content in self.files_v2.items():
+            with open(os.path.join(target, name.split('/', 1)[1]), 'rb') as f:
+                self.assertEqual(f.read(), content)
+
+    def test_no_range_server_falls_back_to_full_download(self):
+        archive = os.path.join(self.root, 'v2.zip')
+        with open(archive, 'rb') as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        save_path = os.path.join(self.updater.custom_dir, 'download.zip')
+        self.updater.pending = {"partial": True, "info": {"sha256": sha256}, "save_path": save_path, "is_continue": False}
+        self.assertTrue(self.updater._download_from(self.plain_server.url + 'v2.zip'))
+        self.assertNotIn("remote_zip", self.updater.pending)
+        with open(save_path, 'rb') as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), sha256)
+
+
+if __name__ == '__main__':
+    unittest.main()